@@ -20,3 +20,19 @@ try:
 except KeyError:
     print('Using default MintPy Path: %s' % (mintpy_path))
     os.environ['MINTPY_HOME'] = mintpy_path
+
+
+def __getattr__(name):
+    """Import the workflow modules, e.g. mintpy.load_data, on their first access."""
+    import importlib
+    workflow = importlib.import_module('mintpy.workflow')
+    if name in workflow.__all__:
+        return getattr(workflow, name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    """List the lazily imported workflow modules as well, for tab completion."""
+    import importlib
+    workflow = importlib.import_module('mintpy.workflow')
+    return sorted(set(globals().keys()) | set(workflow.__all__))
@@ -293,7 +293,7 @@ def read_geometry(ts_file, geom_file=None, box=None):
             print('read 3D bperp from {} file: {} ...'.format(geom_obj.name, os.path.basename(geom_obj.file)))
             dset_list = ['bperp-{}'.format(d) for d in ts_obj.dateList]
             pbase = geom_obj.read(datasetName=dset_list, box=box, print_msg=False).reshape((ts_obj.numDate, -1))
-            pbase -= np.tile(pbase[ts_obj.refIndex, :].reshape(1, -1), (ts_obj.numDate, 1))
+            pbase -= pbase[ts_obj.refIndex, :].reshape(1, -1)
         else:
             print('read mean bperp from {} file'.format(ts_obj.name))
             pbase = ts_obj.pbase.reshape((-1, 1))
@@ -313,6 +313,7 @@ def estimate_dem_error(ts0, G0, tbase, date_flag=None, phase_velocity=False):
     """Estimate DEM error with least square optimization.
     Parameters: ts0            - 2D np.array in size of (numDate, numPixel), original displacement time-series
                 G0             - 2D np.array in size of (numDate, numParam), design matrix in [G_geom, G_defo]
+                                 or 3D np.array in size of (numPixel, numDate, numParam), one per pixel
                 tbase          - 2D np.array in size of (numDate, 1), temporal baseline
                 date_flag      - 1D np.array in bool data type, mark the date used in the estimation
                 phase_velocity - bool, use phase history or phase velocity for minimization
@@ -329,23 +330,38 @@ def estimate_dem_error(ts0, G0, tbase, date_flag=None, phase_velocity=False):
         date_flag = np.ones(ts0.shape[0], np.bool_)
 
     # Prepare Design matrix G and observations ts for inversion
-    G = G0[date_flag, :]
+    G = G0[..., date_flag, :]
     ts = ts0[date_flag, :]
     if phase_velocity:
         tbase = tbase[date_flag, :]
-        G = np.diff(G, axis=0) / np.diff(tbase, axis=0)
+        G = np.diff(G, axis=-2) / np.diff(tbase, axis=0)
         ts = np.diff(ts, axis=0) / np.diff(tbase, axis=0)
 
     # Inverse using L-2 norm to get unknown parameters X
     # X = [delta_z, constC, vel, acc, deltaAcc, ..., step1, step2, ...]
     # equivalent to X = np.dot(np.dot(np.linalg.inv(np.dot(G.T, G)), G.T), ts)
     #               X = np.dot(np.linalg.pinv(G), ts)
-    X = linalg.lstsq(G, ts, cond=1e-15)[0]
+    if G.ndim == 2:
+        # solve in tiles of pixels (~4 MB in float32),
+        # to keep the working set in the CPU cache for large patches
+        num_pixel = ts.shape[1]
+        tile_size = max(int(2**20 / G.shape[0]), 1)
+        X = np.zeros((G.shape[1], num_pixel), dtype=np.result_type(G, ts))
+        for c0 in range(0, num_pixel, tile_size):
+            c1 = min(c0 + tile_size, num_pixel)
+            X[:, c0:c1] = linalg.lstsq(G, ts[:, c0:c1], cond=1e-15)[0]
+    else:
+        # stack of design matrices: batched pseudo-inverse via SVD
+        X = np.einsum('pij,jp->ip', np.linalg.pinv(G, rcond=1e-15), ts)
 
     # Prepare Outputs
     delta_z = X[0, :]
-    ts_cor = ts0 - np.dot(G0[:, 0].reshape(-1, 1), delta_z.reshape(1, -1))
-    ts_res = ts0 - np.dot(G0, X)
+    if G0.ndim == 2:
+        ts_cor = ts0 - G0[:, 0].reshape(-1, 1) * delta_z.reshape(1, -1)
+        ts_res = ts0 - np.dot(G0, X)
+    else:
+        ts_cor = ts0 - G0[:, :, 0].T * delta_z.reshape(1, -1)
+        ts_res = ts0 - np.einsum('pij,jp->ip', G0, X)
 
     # for debug
     debug_mode = False
@@ -467,20 +483,43 @@ def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
         ts_cor[:, mask] = ts_cor_i
         ts_res[:, mask] = ts_res_i
 
+    elif pbase.shape[1] == 1:
+        # 2D geometry with 1D perp baseline: the design matrix of each pixel differs only
+        # in the scaling of the 1st column: G_i = G * diag(1 / (range_dist_i * sin_inc_angle_i), 1, ...)
+        # thus, invert all pixels at once with the pixel-invariant G and scale delta_z back afterwards
+        print('estimating DEM error ...')
+        G = np.hstack((pbase, G_defo))
+
+        # run
+        (delta_z_i,
+         ts_cor_i,
+         ts_res_i) = estimate_dem_error(ts_data[:, mask], G,
+                                        tbase=tbase,
+                                        date_flag=date_flag,
+                                        phase_velocity=phase_velocity)
+
+        # assemble
+        delta_z[mask] = delta_z_i * (range_dist[mask] * sin_inc_angle[mask])
+        ts_cor[:, mask] = ts_cor_i
+        ts_res[:, mask] = ts_res_i
+
     else:
         print('estimating DEM error pixel-wisely ...')
+        # invert in chunks of pixels, with a stack of design matrices (one per pixel) for each chunk,
+        # to replace the python loop over pixels with batched linear algebra in bounded memory
+        chunk_size = 10000
+        num_chunk = int(np.ceil(num_pixel2inv / chunk_size))
         prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
-        for i in range(num_pixel2inv):
-            idx = idx_pixel2inv[i]
+        for i in range(num_chunk):
+            c0 = i * chunk_size
+            c1 = min(c0 + chunk_size, num_pixel2inv)
+            idx = idx_pixel2inv[c0:c1]
 
-            # compose design matrix
-            if pbase.shape[1] == 1:
-                pbase_i = pbase
-            else:
-                pbase_i = pbase[:, idx].reshape(-1, 1)
-
-            G_geom = pbase_i / (range_dist[idx] * sin_inc_angle[idx])
-            G = np.hstack((G_geom, G_defo))
+            # compose design matrix in size of (num_pixel, num_date, num_param)
+            G_geom = pbase[:, idx] / (range_dist[idx] * sin_inc_angle[idx])
+            G = np.empty((idx.size, num_date, G_defo.shape[1] + 1), dtype=np.float32)
+            G[:, :, 0] = G_geom.T
+            G[:, :, 1:] = G_defo
 
             # run
             (delta_z_i,
@@ -492,10 +531,10 @@ def correct_dem_error_patch(G_defo, ts_file, geom_file=None, box=None,
 
             # assemble
             delta_z[idx] = delta_z_i
-            ts_cor[:, idx] = ts_cor_i.flatten()
-            ts_res[:, idx] = ts_res_i.flatten()
+            ts_cor[:, idx] = ts_cor_i
+            ts_res[:, idx] = ts_res_i
 
-            prog_bar.update(i+1, every=2000, suffix='{}/{}'.format(i+1, num_pixel2inv))
+            prog_bar.update(c1, suffix='{}/{}'.format(c1, num_pixel2inv))
         prog_bar.close()
     del ts_data, pbase
 
@@ -584,70 +623,74 @@ def correct_dem_error(inps):
     }
 
     # 3.3 invert / write block-by-block
-    for i, box in enumerate(box_list):
-        box_wid = box[2] - box[0]
-        box_len = box[3] - box[1]
-        if num_box > 1:
-            print('\n------- processing patch {} out of {} --------------'.format(i+1, num_box))
-            print('box width:  {}'.format(box_wid))
-            print('box length: {}'.format(box_len))
-
-        # update box argument in the input data
-        data_kwargs['box'] = box
-
-        # invert
-        if not inps.cluster:
-            # non-parallel
-            delta_z, ts_cor, ts_res = correct_dem_error_patch(**data_kwargs)[:-1]
-
-        else:
-            # parallel
-            print('\n\n------- start parallel processing using Dask -------')
-
-            # initiate the output data
-            delta_z = np.zeros((box_len, box_wid), dtype=np.float32)
-            ts_cor = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
-            ts_res = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
-
-            # initiate dask cluster and client
-            cluster_obj = cluster.DaskCluster(inps.cluster, inps.numWorker, config_name=inps.config)
-            cluster_obj.open()
+    if inps.cluster:
+        # initiate dask cluster and client, once for all boxes
+        cluster_obj = cluster.DaskCluster(inps.cluster, inps.numWorker, config_name=inps.config)
+        cluster_obj.open()
+
+    try:
+        for i, box in enumerate(box_list):
+            box_wid = box[2] - box[0]
+            box_len = box[3] - box[1]
+            if num_box > 1:
+                print('\n------- processing patch {} out of {} --------------'.format(i+1, num_box))
+                print('box width:  {}'.format(box_wid))
+                print('box length: {}'.format(box_len))
+
+            # update box argument in the input data
+            data_kwargs['box'] = box
+
+            # invert
+            if not inps.cluster:
+                # non-parallel
+                delta_z, ts_cor, ts_res = correct_dem_error_patch(**data_kwargs)[:-1]
 
-            # run dask
-            delta_z, ts_cor, ts_res = cluster_obj.run(func=correct_dem_error_patch,
-                                                      func_data=data_kwargs,
-                                                      results=[delta_z, ts_cor, ts_res])
-
-            # close dask cluster and client
+            else:
+                # parallel
+                print('\n\n------- start parallel processing using Dask -------')
+
+                # initiate the output data
+                delta_z = np.zeros((box_len, box_wid), dtype=np.float32)
+                ts_cor = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
+                ts_res = np.zeros((num_date, box_len, box_wid), dtype=np.float32)
+
+                # run dask
+                delta_z, ts_cor, ts_res = cluster_obj.run(func=correct_dem_error_patch,
+                                                          func_data=data_kwargs,
+                                                          results=[delta_z, ts_cor, ts_res])
+
+                print('------- finished parallel processing -------\n\n')
+
+            # write the block to disk
+            # with 3D block in [z0, z1, y0, y1, x0, x1]
+            # and  2D block in         [y0, y1, x0, x1]
+
+            # DEM error - 2D
+            block = [box[1], box[3], box[0], box[2]]
+            writefile.write_hdf5_block(dem_err_file,
+                                       data=delta_z,
+                                       datasetName='dem',
+                                       block=block)
+
+            # corrected time-series - 3D
+            block = [0, num_date, box[1], box[3], box[0], box[2]]
+            writefile.write_hdf5_block(ts_cor_file,
+                                       data=ts_cor,
+                                       datasetName='timeseries',
+                                       block=block)
+
+            # residual time-series - 3D
+            block = [0, num_date, box[1], box[3], box[0], box[2]]
+            writefile.write_hdf5_block(ts_res_file,
+                                       data=ts_res,
+                                       datasetName='timeseries',
+                                       block=block)
+
+    finally:
+        if inps.cluster:
+            # close dask cluster and client, also on errors
             cluster_obj.close()
 
-            print('------- finished parallel processing -------\n\n')
-
-        # write the block to disk
-        # with 3D block in [z0, z1, y0, y1, x0, x1]
-        # and  2D block in         [y0, y1, x0, x1]
-
-        # DEM error - 2D
-        block = [box[1], box[3], box[0], box[2]]
-        writefile.write_hdf5_block(dem_err_file,
-                                   data=delta_z,
-                                   datasetName='dem',
-                                   block=block)
-
-        # corrected time-series - 3D
-        block = [0, num_date, box[1], box[3], box[0], box[2]]
-        writefile.write_hdf5_block(ts_cor_file,
-                                   data=ts_cor,
-                                   datasetName='timeseries',
-                                   block=block)
-
-        # residual time-series - 3D
-        block = [0, num_date, box[1], box[3], box[0], box[2]]
-        writefile.write_hdf5_block(ts_res_file,
-                                   data=ts_res,
-                                   datasetName='timeseries',
-                                   block=block)
-
     # time info
     m, s = divmod(time.time()-start_time, 60)
     print('time used: {:02.0f} mins {:02.1f} secs.'.format(m, s))
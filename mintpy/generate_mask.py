@@ -159,19 +159,22 @@ def create_threshold_mask(inps):
         mask *= nanmask
         print('all pixels with nan value = 0')
 
-    if inps.nonzero:
-        mask[nanmask] *= ~(data[nanmask] == 0.)
-        print('exclude pixels with zero value')
-
-    # min threshold
-    if inps.vmin is not None:
-        mask[nanmask] *= ~(data[nanmask] < inps.vmin)
-        print('exclude pixels with value < %s' % str(inps.vmin))
-
-    # max threshold
-    if inps.vmax is not None:
-        mask[nanmask] *= ~(data[nanmask] > inps.vmax)
-        print('exclude pixels with value > %s' % str(inps.vmax))
+    # value thresholds, applied in place on the full matrix:
+    # comparisons with NaN are False, thus, pixels with nan value are not changed here
+    with np.errstate(invalid='ignore'):
+        if inps.nonzero:
+            mask &= data != 0.
+            print('exclude pixels with zero value')
+
+        # min threshold
+        if inps.vmin is not None:
+            mask &= ~(data < inps.vmin)
+            print('exclude pixels with value < %s' % str(inps.vmin))
+
+        # max threshold
+        if inps.vmax is not None:
+            mask &= ~(data > inps.vmax)
+            print('exclude pixels with value > %s' % str(inps.vmax))
 
     # subset in Y
     if inps.subset_y is not None:
@@ -227,10 +230,7 @@ def create_threshold_mask(inps):
 
     # revert
     if inps.revert:
-        temp = np.array(mask, dtype=np.bool_)
-        mask[temp == True] = False
-        mask[temp == False] = True
-        del temp
+        np.logical_not(mask, out=mask)
 
     # Write mask file
     atr['FILE_TYPE'] = 'mask'
@@ -10,7 +10,6 @@ import os
 import sys
 import time
 import argparse
-import warnings
 import numpy as np
 
 from mintpy.objects.resample import resample
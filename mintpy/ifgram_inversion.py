@@ -20,7 +20,6 @@ import os
 import sys
 import time
 import argparse
-import warnings
 import h5py
 import numpy as np
 from scipy import linalg   # more effieint than numpy.linalg
@@ -312,6 +311,10 @@ def estimate_timeseries(A, B, tbase_diff, ifgram, weight_sqrt=None, min_norm_vel
     opt 2/3 is better than opt 1 because numpy.linalg.inv() can not handle rank defiency of
     design matrix B
 
+    For the un-weighted inversion, all pixels share the same design matrix, thus, opt 2 via
+    lstsq_pinv() is used instead: one pseudo-inverse plus one matrix multiplication (GEMM),
+    which is much faster than opt 4 for a large number of pixels.
+
     Traditional Small BAseline Subsets (SBAS) algorithm (Berardino et al., 2002, IEEE-TGRS)
     is equivalent to the setting of:
         min_norm_velocity=True
@@ -388,7 +391,7 @@ def estimate_timeseries(A, B, tbase_diff, ifgram, weight_sqrt=None, min_norm_vel
                                      np.multiply(ifgram, weight_sqrt),
                                      cond=rcond)[:2]
             else:
-                X, e2 = linalg.lstsq(B, ifgram, cond=rcond)[:2]
+                X, e2 = lstsq_pinv(B, ifgram, rcond=rcond, calc_e2=(inv_quality_name == 'residual'))
 
             # calc inversion quality
             if inv_quality_name == 'residual':
@@ -399,8 +402,9 @@ def estimate_timeseries(A, B, tbase_diff, ifgram, weight_sqrt=None, min_norm_vel
                 inv_quality = calc_inv_quality(ifgram, B, X)
 
             # assemble time-series
-            ts_diff = X * np.tile(tbase_diff, (1, num_pixel))
-            ts[1:, :] = np.cumsum(ts_diff, axis=0)
+            # via broadcasting and cumulative sum into the output array directly
+            ts_diff = np.multiply(X, tbase_diff, out=X)
+            np.cumsum(ts_diff, axis=0, out=ts[1:, :])
 
         # assume minimum-norm deformation phase
         else:
@@ -409,7 +413,7 @@ def estimate_timeseries(A, B, tbase_diff, ifgram, weight_sqrt=None, min_norm_vel
                                      np.multiply(ifgram, weight_sqrt),
                                      cond=rcond)[:2]
             else:
-                X, e2 = linalg.lstsq(A, ifgram, cond=rcond)[:2]
+                X, e2 = lstsq_pinv(A, ifgram, rcond=rcond, calc_e2=(inv_quality_name == 'residual'))
 
             # calc inversion quality
             if inv_quality_name == 'residual':
@@ -428,6 +432,53 @@ def estimate_timeseries(A, B, tbase_diff, ifgram, weight_sqrt=None, min_norm_vel
     return ts, inv_quality, num_inv_obs
 
 
+def lstsq_pinv(G, y, rcond=1e-5, calc_e2=True):
+    """Least squares solution of multiple observations (pixels) sharing the same design matrix,
+    via the pseudo-inverse and one matrix multiplication for all pixels, which is much faster
+    than scipy.linalg.lstsq() for a large number of pixels.
+
+    Parameters: G       - 2D np.array in size of (num_obs, num_param), design matrix
+                y       - 2D np.array in size of (num_obs, num_pixel), observations
+                rcond   - float, cut-off ratio of small singular values of G
+                calc_e2 - bool, calculate the sum of squared residuals or not
+    Returns:    X       - 2D np.array in size of (num_param, num_pixel), solution
+                e2      - 1D np.array in size of (num_pixel), sum of squared residuals,
+                          empty if not calculated, or if G is rank deficient or num_obs <= num_param,
+                          same as scipy.linalg.lstsq()
+    """
+    U, s, Vh = linalg.svd(G, full_matrices=False)
+    flag = s > rcond * s[0]
+    G_inv = np.dot(Vh[flag, :].T / s[flag], U[:, flag].T).astype(y.dtype)
+    X = np.dot(G_inv, y)
+
+    e2 = np.zeros(0, dtype=X.dtype)
+    if calc_e2 and G.shape[0] > G.shape[1] and np.sum(flag) == G.shape[1]:
+        res = y - np.dot(G, X)
+        e2 = np.sum(res**2, axis=0)
+    return X, e2
+
+
+def calc_temporal_coherence(ifgram_diff):
+    """Calculate the temporal coherence, i.e. |sum(exp(j*ifgram_diff))| / num_ifgram
+
+    Equivalent to the complex form, but via the sum of cosine and sine in real numbers,
+    to avoid the complex temporary array and the complex exponential.
+
+    Parameters: ifgram_diff - 2D np.array in size of (num_ifgram, num_pixel), residual phase
+    Returns:    temp_coh    - 1D np.array in size of (num_pixel), temporal coherence
+    """
+    num_ifgram = ifgram_diff.shape[0]
+
+    # re-use one buffer for both cosine and sine
+    buf = np.cos(ifgram_diff)
+    real = np.sum(buf, axis=0)
+    np.sin(ifgram_diff, out=buf)
+    imag = np.sum(buf, axis=0)
+
+    temp_coh = np.hypot(real, imag) / num_ifgram
+    return temp_coh
+
+
 def calc_inv_quality(ifgram, G, X, inv_quality_name='temporalCoherence'):
     """Calculate the temporal coherence from the network inversion results
 
@@ -452,30 +503,32 @@ def calc_inv_quality(ifgram, G, X, inv_quality_name='temporalCoherence'):
             c0 = i * chunk_size
             c1 = min((i + 1) * chunk_size, num_pixel)
 
-            # calc residual
-            ifgram_diff = ifgram[:, c0:c1] - np.dot(G, X[:, c0:c1])
+            # calc residual (in place of the predicted phase)
+            ifgram_diff = np.dot(G, X[:, c0:c1])
+            np.subtract(ifgram[:, c0:c1], ifgram_diff, out=ifgram_diff)
 
             # calc inv quality
             if inv_quality_name == 'residual':
                 # square root of the L-2 norm residual
                 inv_quality[c0:c1] = np.sqrt(np.sum(np.abs(ifgram_diff) ** 2, axis=0))
             else:
-                inv_quality[c0:c1] = np.abs(np.sum(np.exp(1j*ifgram_diff), axis=0)) / num_ifgram
+                inv_quality[c0:c1] = calc_temporal_coherence(ifgram_diff)
 
             # print out message
             if (i+1) % num_chunk_step == 0:
                 print('chunk {} / {}'.format(i+1, num_chunk))
 
     else:
-        # calc residual
-        ifgram_diff = ifgram - np.dot(G, X)
+        # calc residual (in place of the predicted phase)
+        ifgram_diff = np.dot(G, X)
+        np.subtract(ifgram, ifgram_diff, out=ifgram_diff)
 
         # calc inv quality
         if inv_quality_name == 'residual':
             # square root of the L-2 norm residual
             inv_quality = np.sqrt(np.sum(np.abs(ifgram_diff) ** 2, axis=0))
         else:
-            inv_quality = np.abs(np.sum(np.exp(1j*ifgram_diff), axis=0)) / num_ifgram
+            inv_quality = calc_temporal_coherence(ifgram_diff)
 
     return inv_quality
 
@@ -622,43 +675,49 @@ def read_unwrap_phase(stack_obj, box, ref_phase, obs_ds_name='unwrapPhase', drop
         raise Exception('No reference phase input/found on file!'+
                         ' unwrapped phase is not referenced!')
 
-    # reference unwrapPhase
-    for i in range(num_ifgram):
-        mask = pha_data[i, :] != 0.
-        pha_data[i, :][mask] -= ref_phase[i]
+    # reference unwrapPhase, for pixels with non-zero value only
+    # in one pass for all interferograms
+    ref_phase = np.array(ref_phase, dtype=pha_data.dtype).reshape(-1, 1)
+    np.subtract(pha_data, ref_phase, out=pha_data, where=(pha_data != 0.))
     return pha_data
 
 
 def mask_unwrap_phase(pha_data, stack_obj, box, mask_ds_name=None, mask_threshold=0.4,
-                      dropIfgram=True, print_msg=True):
-    """Mask input unwrapped phase by setting them to np.nan."""
+                      dropIfgram=True, print_msg=True, msk_data=None):
+    """Mask input unwrapped phase by setting them to np.nan.
+    msk_data - 2D np.ndarray in size of (num_ifgram, num_pixel), data of mask_ds_name
+               if already read, to skip reading it again.
+    """
 
     # Read/Generate Mask
     num_ifgram = stack_obj.get_size(dropIfgram=dropIfgram)[0]
     if mask_ds_name and mask_ds_name in stack_obj.datasetNames:
-        if print_msg:
-            print('reading {} in {} * {} ...'.format(mask_ds_name, box, num_ifgram))
-
-        msk_data = stack_obj.read(datasetName=mask_ds_name,
-                                  box=box,
-                                  dropIfgram=dropIfgram,
-                                  print_msg=False).reshape(num_ifgram, -1)
-        # set all NaN values in coherence, connectComponent, offsetSNR to zero
-        # to avoid RuntimeWarning msg during math operation
-        msk_data[np.isnan(msk_data)] = 0
-
+        if msk_data is None:
+            if print_msg:
+                print('reading {} in {} * {} ...'.format(mask_ds_name, box, num_ifgram))
+
+            msk_data = stack_obj.read(datasetName=mask_ds_name,
+                                      box=box,
+                                      dropIfgram=dropIfgram,
+                                      print_msg=False).reshape(num_ifgram, -1)
+        # boolean mask of pixels to keep, with NaN values in coherence, connectComponent, offsetSNR
+        # masked out, without writing zeros into msk_data first
         if mask_ds_name in ['coherence', 'offsetSNR']:
-            msk_data = msk_data >= mask_threshold
+            # NaN >= mask_threshold is False
+            flag = msk_data >= mask_threshold
             if print_msg:
                 print('mask out pixels with {} < {} by setting them to NaN'.format(mask_ds_name, mask_threshold))
 
-        elif mask_ds_name in ['connectComponent']:
-            if print_msg:
+        else:
+            flag = msk_data != 0.
+            if np.issubdtype(msk_data.dtype, np.floating):
+                flag &= ~np.isnan(msk_data)
+            if mask_ds_name in ['connectComponent'] and print_msg:
                 print('mask out pixels with {} == 0 by setting them to NaN'.format(mask_ds_name))
 
         # set values of mask-out pixels to NaN
-        pha_data[msk_data == 0.] = np.nan
-        del msk_data
+        pha_data[~flag] = np.nan
+        del msk_data, flag
 
     return pha_data
 
@@ -679,14 +738,19 @@ def read_coherence(stack_obj, box, dropIfgram=True, print_msg=True):
     return coh_data
 
 
-def calc_weight(stack_obj, box, weight_func='var', dropIfgram=True, chunk_size=100000):
+def calc_weight(stack_obj, box, weight_func='var', dropIfgram=True, chunk_size=100000, coh_data=None):
     """Read coherence and calculate weight from it, chunk by chunk to save memory
+    coh_data - 2D np.ndarray in size of (num_ifgram, num_pixel), coherence if already read,
+               it will be converted into weight in place.
     """
 
     print('calculating weight from spatial coherence ...')
 
     # read coherence
-    weight = read_coherence(stack_obj, box=box, dropIfgram=dropIfgram)
+    if coh_data is None:
+        weight = read_coherence(stack_obj, box=box, dropIfgram=dropIfgram)
+    else:
+        weight = coh_data
     num_pixel = weight.shape[1]
 
     if 'NCORRLOOKS' in stack_obj.metadata.keys():
@@ -728,7 +792,8 @@ def calc_weight(stack_obj, box, weight_func='var', dropIfgram=True, chunk_size=1
 
 def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='unwrapPhase',
                            weight_func='var', water_mask_file=None, min_norm_velocity=True,
-                           mask_ds_name=None, mask_threshold=0.4, min_redundancy=1.0):
+                           mask_ds_name=None, mask_threshold=0.4, min_redundancy=1.0,
+                           A=None, B=None, tbase_diff=None):
     """Invert one patch of an ifgram stack into timeseries.
 
     Parameters: box               - tuple of 4 int, indicating (x0, y0, x1, y1) of the area of interest
@@ -742,6 +807,10 @@ def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='u
                 mask_ds_name      - str, dataset name in ifgram_file used to mask unwrapPhase pixelwisely
                 mask_threshold    - float, min coherence of pixels if mask_dataset_name='coherence'
                 min_redundancy    - float, the min number of ifgrams for every acquisition.
+                A / B             - 2D array in size of (num_ifgram, num_date-1), design matrices
+                tbase_diff        - 2D array in size of (num_date-1, 1), differential temporal baseline in years
+                                    A, B and tbase_diff are the same for all patches,
+                                    thus, calculated here only if not given.
     Returns:    ts                - 3D array in size of (num_date, num_row, num_col)
                 inv_quality       - 2D array in size of (num_row, num_col)
                 num_inv_ifg       - 2D array in size of (num_row, num_col)
@@ -768,14 +837,16 @@ def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='u
     num_pixel = num_row * num_col
 
     # get tbase_diff in the unit of year
-    date_list = stack_obj.get_date_list(dropIfgram=True)
-    num_date = len(date_list)
-    tbase = np.array(ptime.date_list2tbase(date_list)[0], np.float32) / 365.25
-    tbase_diff = np.diff(tbase).reshape(-1, 1)
+    if tbase_diff is None:
+        date_list = stack_obj.get_date_list(dropIfgram=True)
+        tbase = np.array(ptime.date_list2tbase(date_list)[0], np.float32) / 365.25
+        tbase_diff = np.diff(tbase).reshape(-1, 1)
 
     # design matrix
-    date12_list = stack_obj.get_date12_list(dropIfgram=True)
-    A, B = stack_obj.get_design_matrix4timeseries(date12_list=date12_list)[0:2]
+    if A is None or B is None:
+        date12_list = stack_obj.get_date12_list(dropIfgram=True)
+        A, B = stack_obj.get_design_matrix4timeseries(date12_list=date12_list)[0:2]
+    num_date = A.shape[1] + 1
 
     # prep for decor std time-series
     #if os.path.isfile('reference_date.txt'):
@@ -787,17 +858,7 @@ def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='u
     #time_idx = [i for i in range(num_date)]
     #time_idx.remove(ref_idx)
 
-    # 1.1 read / calculate weight
-    if weight_func in ['no', 'sbas']:
-        weight = None
-    else:
-        weight = calc_weight(stack_obj,
-                             box,
-                             weight_func=weight_func,
-                             dropIfgram=True,
-                             chunk_size=100000)
-
-    # 1.2 read / mask unwrapPhase / offset
+    # 1.1 read / mask unwrapPhase / offset
     pha_data = read_unwrap_phase(stack_obj,
                                  box,
                                  ref_phase,
@@ -810,12 +871,30 @@ def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='u
         pha_data[pha_data == 0.] = np.nan
         print('convert zero value in {} to NaN (no-data value)'.format(obs_ds_name))
 
+    # read coherence only once, if it is used for both masking and weighting
+    coh_data = None
+    if mask_ds_name == 'coherence' and weight_func not in ['no', 'sbas']:
+        coh_data = read_coherence(stack_obj, box=box, dropIfgram=True)
+
     pha_data = mask_unwrap_phase(pha_data,
                                  stack_obj,
                                  box,
                                  dropIfgram=True,
                                  mask_ds_name=mask_ds_name,
-                                 mask_threshold=mask_threshold)
+                                 mask_threshold=mask_threshold,
+                                 msk_data=coh_data)
+
+    # 1.2 read / calculate weight
+    if weight_func in ['no', 'sbas']:
+        weight = None
+    else:
+        weight = calc_weight(stack_obj,
+                             box,
+                             weight_func=weight_func,
+                             dropIfgram=True,
+                             chunk_size=100000,
+                             coh_data=coh_data)
+    del coh_data
 
     # 1.3 mask of pixels to invert
     mask = np.ones(num_pixel, np.bool_)
@@ -835,8 +914,10 @@ def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='u
         del waterMask
 
     # 1.3.2 - Mask for NaN value in ALL ifgrams
+    # flag of valid (~NaN) observations, computed once and reused in the inversion below
     print('skip pixels with {} = NaN in all interferograms'.format(obs_ds_name))
-    mask *= ~np.all(np.isnan(pha_data), axis=0)
+    pha_valid = ~np.isnan(pha_data)
+    mask *= np.any(pha_valid, axis=0)
 
     # 1.3.3 Mask for zero quality measure (average spatial coherence/SNR)
     # usually due to lack of data in the processing
@@ -881,7 +962,7 @@ def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='u
 
         # a. split mask into mask_all/part_net
         # mask for valid (~NaN) observations in ALL ifgrams (share one B in sbas inversion)
-        mask_all_net = np.all(~np.isnan(pha_data), axis=0)
+        mask_all_net = np.all(pha_valid, axis=0)
         mask_all_net *= mask
         mask_part_net = mask ^ mask_all_net
         del mask
@@ -910,38 +991,84 @@ def ifgram_inversion_patch(ifgram_file, box=None, ref_phase=None, obs_ds_name='u
                                                            np.sum(mask_all_net)/num_pixel2inv*100))
             num_pixel2inv = int(np.sum(mask_part_net))
             idx_pixel2inv = np.where(mask_part_net)[0]
+
+            # group pixels by their pattern of valid observations:
+            # pixels with the same pattern share the same design matrix,
+            # thus, could be inverted at once as a multi-column least squares problem
+            flag_valid = pha_valid[:, idx_pixel2inv]
+            del pha_valid
+            group_id = np.unique(flag_valid, axis=1, return_inverse=True)[1].reshape(-1)
+            group_size = np.bincount(group_id)
+            idx_groups = np.split(idx_pixel2inv[np.argsort(group_id, kind='stable')],
+                                  np.cumsum(group_size)[:-1])
+            del flag_valid, group_id
+            print('number of unique patterns of valid observations: {}'.format(len(idx_groups)))
+
             prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
-            for i in range(num_pixel2inv):
-                idx = idx_pixel2inv[i]
+            num_pixel_done = 0
+            for idx in idx_groups:
                 tsi, inv_quali, num_ifgi = estimate_timeseries(A, B, tbase_diff,
                                                                ifgram=pha_data[:, idx],
                                                                weight_sqrt=None,
                                                                min_norm_velocity=min_norm_velocity,
                                                                min_redundancy=min_redundancy,
                                                                inv_quality_name=inv_quality_name)
-                ts[:, idx] = tsi.flatten()
+                ts[:, idx] = tsi
                 inv_quality[idx] = inv_quali
                 num_inv_ifg[idx] = num_ifgi
-                prog_bar.update(i+1, every=2000, suffix='{}/{} pixels'.format(i+1, num_pixel2inv))
+                num_pixel_done += idx.size
+                prog_bar.update(num_pixel_done, suffix='{}/{} pixels'.format(num_pixel_done, num_pixel2inv))
             prog_bar.close()
 
     # 2.3 weighted inversion - pixel-by-pixel
     else:
         print('inverting network of interferograms into time-series ...')
-        prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
-        for i in range(num_pixel2inv):
-            idx = idx_pixel2inv[i]
-            tsi, inv_quali, num_ifgi = estimate_timeseries(A, B, tbase_diff,
-                                                           ifgram=pha_data[:, idx],
-                                                           weight_sqrt=weight[:, idx],
-                                                           min_norm_velocity=min_norm_velocity,
-                                                           min_redundancy=min_redundancy,
-                                                           inv_quality_name=inv_quality_name)
-            ts[:, idx] = tsi.flatten()
-            inv_quality[idx] = inv_quali
-            num_inv_ifg[idx] = num_ifgi
+        # pixel-major layout for the pixels to invert only,
+        # so that the observations / weights of each pixel are contiguous in memory
+        pha_data = pha_data.T[idx_pixel2inv]
+        weight = weight.T[idx_pixel2inv]
+
+        # group pixels by their pattern of valid observations:
+        # the design matrices and their redundancy / invertibility checks depend on the pattern only,
+        # thus, are prepared once per group, instead of once per pixel in estimate_timeseries()
+        flag_list, group_id = np.unique(pha_valid.T[idx_pixel2inv], axis=0, return_inverse=True)
+        del pha_valid
+        group_id = group_id.reshape(-1)
+        group_size = np.bincount(group_id)
+        idx_groups = np.split(np.argsort(group_id, kind='stable'), np.cumsum(group_size)[:-1])
+        del group_id
 
-            prog_bar.update(i+1, every=2000, suffix='{}/{} pixels'.format(i+1, num_pixel2inv))
+        prog_bar = ptime.progressBar(maxValue=num_pixel2inv)
+        num_pixel_done = 0
+        for flag, idx_group in zip(flag_list, idx_groups):
+            num_pixel_done += idx_group.size
+            prog_bar.update(num_pixel_done, suffix='{}/{} pixels'.format(num_pixel_done, num_pixel2inv))
+
+            Ai, Bi = A, B
+            if not np.all(flag):
+                Ai, Bi = A[flag, :], B[flag, :]
+
+                # skip the pixels if redundancy < threshold
+                if np.min(np.sum(Ai != 0., axis=0)) < min_redundancy:
+                    continue
+
+                # check matrix invertability
+                try:
+                    linalg.inv(np.dot(Bi.T, Bi))
+                except linalg.LinAlgError:
+                    continue
+
+            for i in idx_group:
+                idx = idx_pixel2inv[i]
+                tsi, inv_quali, num_ifgi = estimate_timeseries(Ai, Bi, tbase_diff,
+                                                               ifgram=pha_data[i, flag],
+                                                               weight_sqrt=weight[i, flag],
+                                                               min_norm_velocity=min_norm_velocity,
+                                                               min_redundancy=min_redundancy,
+                                                               inv_quality_name=inv_quality_name)
+                ts[:, idx] = tsi.flatten()
+                inv_quality[idx] = inv_quali
+                num_inv_ifg[idx] = num_ifgi
         prog_bar.close()
         del weight
     del pha_data
@@ -1000,9 +1127,12 @@ def ifgram_inversion(inps=None):
                                                   skip_reference=inps.skip_ref,
                                                   dropIfgram=True)
 
-    # 1.2 design matrix
-    A = stack_obj.get_design_matrix4timeseries(date12_list)[0]
+    # 1.2 design matrix and temporal baseline in years
+    # calculated once here and shared by all patches
+    A, B = stack_obj.get_design_matrix4timeseries(date12_list)[0:2]
     num_ifgram, num_date = A.shape[0], A.shape[1]+1
+    tbase = np.array(ptime.date_list2tbase(date_list)[0], np.float32) / 365.25
+    tbase_diff = np.diff(tbase).reshape(-1, 1)
     inps.numIfgram = num_ifgram
 
     # 1.3 print key setup info
@@ -1090,75 +1220,82 @@ def ifgram_inversion(inps=None):
         "water_mask_file"   : inps.waterMaskFile,
         "mask_ds_name"      : inps.maskDataset,
         "mask_threshold"    : inps.maskThreshold,
-        "min_redundancy"    : inps.minRedundancy
+        "min_redundancy"    : inps.minRedundancy,
+        "A"                 : A,
+        "B"                 : B,
+        "tbase_diff"        : tbase_diff,
     }
 
     # 3.3 invert / write block-by-block
-    for i, box in enumerate(box_list):
-        box_wid = box[2] - box[0]
-        box_len = box[3] - box[1]
-        if num_box > 1:
-            print('\n------- processing patch {} out of {} --------------'.format(i+1, num_box))
-            print('box width:  {}'.format(box_wid))
-            print('box length: {}'.format(box_len))
-
-        # update box argument in the input data
-        data_kwargs['box'] = box
-
-        if not inps.cluster:
-            # non-parallel
-            ts, inv_quality, num_inv_ifg = ifgram_inversion_patch(**data_kwargs)[:-1]
-
-        else:
-            # parallel
-            print('\n\n------- start parallel processing using Dask -------')
+    if inps.cluster:
+        # initiate dask cluster and client, once for all boxes
+        cluster_obj = cluster.DaskCluster(inps.cluster, inps.numWorker, config_name=inps.config)
+        cluster_obj.open()
 
-            # initiate the output data
-            ts = np.zeros((num_date, box_len, box_wid), np.float32)
-            inv_quality = np.zeros((box_len, box_wid), np.float32)
-            num_inv_ifg  = np.zeros((box_len, box_wid), np.float32)
+    try:
+        for i, box in enumerate(box_list):
+            box_wid = box[2] - box[0]
+            box_len = box[3] - box[1]
+            if num_box > 1:
+                print('\n------- processing patch {} out of {} --------------'.format(i+1, num_box))
+                print('box width:  {}'.format(box_wid))
+                print('box length: {}'.format(box_len))
 
-            # initiate dask cluster and client
-            cluster_obj = cluster.DaskCluster(inps.cluster, inps.numWorker, config_name=inps.config)
-            cluster_obj.open()
+            # update box argument in the input data
+            data_kwargs['box'] = box
 
-            # run dask
-            ts, inv_quality, num_inv_ifg = cluster_obj.run(func=ifgram_inversion_patch,
-                                                           func_data=data_kwargs,
-                                                           results=[ts, inv_quality, num_inv_ifg])
+            if not inps.cluster:
+                # non-parallel
+                ts, inv_quality, num_inv_ifg = ifgram_inversion_patch(**data_kwargs)[:-1]
 
-            # close dask cluster and client
+            else:
+                # parallel
+                print('\n\n------- start parallel processing using Dask -------')
+
+                # initiate the output data
+                ts = np.zeros((num_date, box_len, box_wid), np.float32)
+                inv_quality = np.zeros((box_len, box_wid), np.float32)
+                num_inv_ifg  = np.zeros((box_len, box_wid), np.float32)
+
+                # run dask
+                ts, inv_quality, num_inv_ifg = cluster_obj.run(func=ifgram_inversion_patch,
+                                                               func_data=data_kwargs,
+                                                               results=[ts, inv_quality, num_inv_ifg])
+
+                print('------- finished parallel processing -------\n\n')
+
+            # write the block to disk
+            # with 3D block in [z0, z1, y0, y1, x0, x1]
+            # and  2D block in         [y0, y1, x0, x1]
+            # time-series - 3D
+            block = [0, num_date, box[1], box[3], box[0], box[2]]
+            writefile.write_hdf5_block(inps.tsFile,
+                                       data=ts,
+                                       datasetName='timeseries',
+                                       block=block)
+
+            # temporal coherence - 2D
+            block = [box[1], box[3], box[0], box[2]]
+            writefile.write_hdf5_block(inps.invQualityFile,
+                                       data=inv_quality,
+                                       datasetName=inv_quality_name,
+                                       block=block)
+
+            # number of inverted obs - 2D
+            writefile.write_hdf5_block(inps.numInvFile,
+                                       data=num_inv_ifg,
+                                       datasetName='mask',
+                                       block=block)
+
+            if num_box > 1:
+                m, s = divmod(time.time() - start_time, 60)
+                print('time used: {:02.0f} mins {:02.1f} secs.\n'.format(m, s))
+
+    finally:
+        if inps.cluster:
+            # close dask cluster and client, also on errors
             cluster_obj.close()
 
-            print('------- finished parallel processing -------\n\n')
-
-        # write the block to disk
-        # with 3D block in [z0, z1, y0, y1, x0, x1]
-        # and  2D block in         [y0, y1, x0, x1]
-        # time-series - 3D
-        block = [0, num_date, box[1], box[3], box[0], box[2]]
-        writefile.write_hdf5_block(inps.tsFile,
-                                   data=ts,
-                                   datasetName='timeseries',
-                                   block=block)
-
-        # temporal coherence - 2D
-        block = [box[1], box[3], box[0], box[2]]
-        writefile.write_hdf5_block(inps.invQualityFile,
-                                   data=inv_quality,
-                                   datasetName=inv_quality_name,
-                                   block=block)
-
-        # number of inverted obs - 2D
-        writefile.write_hdf5_block(inps.numInvFile,
-                                   data=num_inv_ifg,
-                                   datasetName='mask',
-                                   block=block)
-
-        if num_box > 1:
-            m, s = divmod(time.time() - start_time, 60)
-            print('time used: {:02.0f} mins {:02.1f} secs.\n'.format(m, s))
-
     # 3.4 update output data on the reference pixel (for phase)
     if not inps.skip_ref:
         # grab ref_y/x
@@ -105,6 +105,8 @@ def create_parser():
                         help='Disable the update mode, or skip checking dataset already loaded.')
     parser.add_argument('--compression', choices={'gzip', 'lzf', None}, default=None,
                         help='compress loaded geometry while writing HDF5 file, default: None.')
+    parser.add_argument('--num-thread', dest='numThread', type=int, default=1,
+                        help='number of threads to read the input files in parallel, default: 1.')
 
     parser.add_argument('-o', '--output', type=str, nargs=3, dest='outfile',
                         default=['./inputs/ifgramStack.h5',
@@ -850,7 +852,8 @@ def main(iargs=None):
                             xstep=iDict['xstep'],
                             ystep=iDict['ystep'],
                             compression=comp,
-                            extra_metadata=extraDict)
+                            extra_metadata=extraDict,
+                            num_thread=iDict['numThread'])
 
     if geomRadarObj and update_object(inps.outfile[1], geomRadarObj, box,
                                       updateMode=updateMode,
@@ -863,7 +866,8 @@ def main(iargs=None):
                                 xstep=iDict['xstep'],
                                 ystep=iDict['ystep'],
                                 compression='lzf',
-                                extra_metadata=extraDict)
+                                extra_metadata=extraDict,
+                                num_thread=iDict['numThread'])
 
     if geomGeoObj and update_object(inps.outfile[2], geomGeoObj, boxGeo,
                                     updateMode=updateMode,
@@ -875,7 +879,8 @@ def main(iargs=None):
                               box=boxGeo,
                               xstep=iDict['xstep'],
                               ystep=iDict['ystep'],
-                              compression='lzf')
+                              compression='lzf',
+                              num_thread=iDict['numThread'])
 
     # time info
     m, s = divmod(time.time()-start_time, 60)
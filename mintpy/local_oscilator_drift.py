@@ -102,6 +102,7 @@ def correct_local_oscilator_drift(fname, rg_dist_file=None, out_file=None):
         # correct LOD
         diff_year = np.array(obj.yearList)
         diff_year -= diff_year[obj.refIndex]
+        # slice by slice, to avoid a temporary array in the size of the whole time-series
         for i in range(data.shape[0]):
             data[i, :, :] -= ramp_rate * diff_year[i]
 
@@ -13,11 +13,6 @@ import warnings
 import h5py
 import numpy as np
 
-# suppress numpy.RuntimeWarning message
-import logging
-np_logger = logging.getLogger('numpy')
-np_logger.setLevel(logging.WARNING)
-
 from mintpy.utils import (
     readfile,
     writefile,
@@ -12,12 +12,24 @@ import os
 import time
 import glob
 import shutil
+import itertools
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 
 # supported / tested clusters
 CLUSTER_LIST = ['lsf', 'pbs', 'slurm', 'local']
 
+# env variables controlling the number of threads of multi-threaded libraries, e.g. BLAS/LAPACK
+NUM_THREADS_ENV_LIST = [
+    'OMP_NUM_THREADS',         # openmp
+    'OPENBLAS_NUM_THREADS',    # openblas
+    'MKL_NUM_THREADS',         # mkl
+    'NUMEXPR_NUM_THREADS',     # numexpr
+    'VECLIB_MAXIMUM_THREADS',  # accelerate
+]
+
 
 ############################## Utilities functions #########################################
 
@@ -67,6 +79,78 @@ def split_box2sub_boxes(box, num_split, dimension='x', print_msg=False):
     return sub_boxes
 
 
+def set_num_threads(num_threads=None, print_msg=True):
+    """limit the number of threads for all supported multi-threaded libraries.
+
+    It is used to avoid oversubscription of the CPU cores, when running multiple
+    dask workers, each of which calls multi-threaded BLAS/LAPACK routines.
+    It only applies to processes started afterwards, e.g. dask workers.
+
+    :param num_threads: str/int, number of threads, e.g. 1
+    :param print_msg: bool
+    :return: num_threads_dict: dict, original value of the env variables, for roll back
+    """
+    num_threads_dict = {}
+    if num_threads is not None:
+        for key in NUM_THREADS_ENV_LIST:
+            num_threads_dict[key] = os.environ.get(key, None)
+            os.environ[key] = str(num_threads)
+
+        if print_msg:
+            print('limit the number of threads of multi-threaded libraries to {}'.format(num_threads))
+    return num_threads_dict
+
+
+def roll_back_num_threads(num_threads_dict, print_msg=True):
+    """restore the env variables on the number of threads changed by set_num_threads().
+
+    :param num_threads_dict: dict, original value of the env variables
+    :param print_msg: bool
+    """
+    if not num_threads_dict:
+        return
+
+    for key, value in num_threads_dict.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+    if print_msg:
+        print('roll back the number of threads of multi-threaded libraries to the original')
+    return
+
+
+def prefetch_map(func, args_iter, num_worker=1, pool_class=ThreadPoolExecutor, **pool_kwargs):
+    """Ordered map with a bounded look-ahead: up to num_worker calls run in the pool,
+    while the caller consumes (e.g. writes to disk) the result of the current one.
+
+    :param func: function, to be called as func(*args) for each args in args_iter,
+                 picklable (module level) for ProcessPoolExecutor
+    :param args_iter: iterable of tuple, positional arguments of each call, consumed lazily,
+                      so that the input data is read only shortly before it is needed
+    :param num_worker: int, number of threads / processes, run in serial in the current process if <= 1
+    :param pool_class: concurrent.futures.Executor subclass, ThreadPoolExecutor or ProcessPoolExecutor
+    :param pool_kwargs: dict, other arguments of pool_class, e.g. initializer / initargs
+    :return: generator of func(*args), in the same order as args_iter
+    """
+    if num_worker <= 1:
+        for args in args_iter:
+            yield func(*args)
+        return
+
+    args_iter = iter(args_iter)
+    with pool_class(max_workers=num_worker, **pool_kwargs) as executor:
+        futures = collections.deque(executor.submit(func, *args)
+                                    for args in itertools.islice(args_iter, num_worker))
+        while futures:
+            future = futures.popleft()
+            # keep num_worker calls submitted while waiting for the current one
+            for args in itertools.islice(args_iter, 1):
+                futures.append(executor.submit(func, *args))
+            yield future.result()
+
+
 
 ############################## Beginning of DaskCluster class ##############################
 
@@ -117,6 +201,7 @@ class DaskCluster:
         ## intitial value
         self.cluster = None
         self.client = None
+        self.num_threads_dict = {}
 
 
     def open(self):
@@ -128,6 +213,11 @@ class DaskCluster:
         if self.cluster_type == 'local':
             from dask.distributed import LocalCluster
 
+            # one thread per worker for multi-threaded libraries (BLAS, etc.)
+            # to avoid oversubscription; only during the life time of the cluster,
+            # thus, the non-parallel processing still uses all cores.
+            self.num_threads_dict = set_num_threads(1)
+
             # initiate cluster object
             self.cluster = LocalCluster()
 
@@ -183,8 +273,10 @@ class DaskCluster:
 
         # This line needs to be in a function or in a `if __name__ == "__main__":` block. If it is in no function
         # or "main" block, each worker will try to create its own client (which is bad) when loading the module
-        print('initiate Dask client')
-        self.client = Client(self.cluster)
+        # initiate the client only once, as the cluster may be re-used to run multiple boxes
+        if self.client is None:
+            print('initiate Dask client')
+            self.client = Client(self.cluster)
 
         # split the primary box into sub boxes for each worker
         box = func_data["box"]
@@ -284,8 +376,14 @@ class DaskCluster:
         self.cluster.close()
         print('close dask cluster')
 
-        self.client.close()
-        print('close dask client')
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            print('close dask client')
+
+        # restore the number of threads for multi-threaded libraries
+        roll_back_num_threads(self.num_threads_dict)
+        self.num_threads_dict = {}
 
         # move *.o/.e files produced by dask in stdout/stderr
         self.move_dask_stdout_stderr_files()
@@ -391,14 +391,9 @@ class GPS:
             ref_site_lalo = ref_obj.get_stat_lat_lon(print_msg=print_msg)
 
             # get relative LOS displacement on common dates
-            dates = np.array(sorted(list(set(self.dates) & set(ref_obj.dates))))
-            dis = np.zeros(dates.shape, np.float32)
-            std = np.zeros(dates.shape, np.float32)
-            for i in range(len(dates)):
-                idx1 = np.where(self.dates == dates[i])[0][0]
-                idx2 = np.where(ref_obj.dates == dates[i])[0][0]
-                dis[i] = self.dis_los[idx1] - ref_obj.dis_los[idx2]
-                std[i] = (self.std_los[idx1]**2 + ref_obj.std_los[idx2]**2)**0.5
+            dates, idx1, idx2 = np.intersect1d(self.dates, ref_obj.dates, return_indices=True)
+            dis = np.array(self.dis_los[idx1] - ref_obj.dis_los[idx2], np.float32)
+            std = np.array((self.std_los[idx1]**2 + ref_obj.std_los[idx2]**2)**0.5, np.float32)
         else:
             ref_site_lalo = None
 
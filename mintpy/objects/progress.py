@@ -8,10 +8,8 @@
 #   from mintpy.utils.ptime import progressBar
 
 
-import os
 import sys
 import time
-import numpy as np
 
 
 ###########################Simple progress bar######################
@@ -70,14 +68,14 @@ class progressBar:
             suffix = ' '+suffix
 
         # Figure out the new percent done (round to an integer)
-        diffFromMin = np.float(self.amount - self.min)
-        percentDone = (diffFromMin / np.float(self.span)) * 100.0
-        percentDone = np.int(np.round(percentDone))
+        diffFromMin = float(self.amount - self.min)
+        percentDone = (diffFromMin / float(self.span)) * 100.0
+        percentDone = int(round(percentDone))
 
         # Figure out how many hash bars the percentage should be
         allFull = self.width - 2 - 18
         numHashes = (percentDone / 100.0) * allFull
-        numHashes = np.int(np.round(numHashes))
+        numHashes = int(round(numHashes))
 
         # Build a progress bar with an arrow of equal signs; special cases for empty and full
         if numHashes == 0:
@@ -9,8 +9,6 @@
 
 
 import os
-import sys
-import re
 import time
 from datetime import datetime as dt, timedelta
 import h5py
@@ -743,7 +741,8 @@ class ifgramStack:
             self.sliceList += ['{}-{}'.format(dsName, i) for i in self.date12List]
 
         # Time in timeseries domain
-        self.dateList = self.get_date_list(dropIfgram=False)
+        # from the date1/2 read above, instead of reading them from file again
+        self.dateList = sorted(list(set(self.mDates.tolist() + self.sDates.tolist())))
         self.numDate = len(self.dateList)
 
         # Reference pixel
@@ -804,8 +803,10 @@ class ifgramStack:
         # convert date from str to datetime.datetime objects
         self.mDates = np.array([i.decode('utf8') for i in dates[:, 0]])
         self.sDates = np.array([i.decode('utf8') for i in dates[:, 1]])
-        self.mTimes = np.array([dt.strptime(i, self.dateFormat) for i in self.mDates])
-        self.sTimes = np.array([dt.strptime(i, self.dateFormat) for i in self.sDates])
+        # parse each unique date only once, as one date is shared by multiple ifgrams
+        date2time = {i: dt.strptime(i, self.dateFormat) for i in set(self.mDates) | set(self.sDates)}
+        self.mTimes = np.array([date2time[i] for i in self.mDates])
+        self.sTimes = np.array([date2time[i] for i in self.sDates])
 
     def read(self, datasetName='unwrapPhase', box=None, print_msg=True, dropIfgram=False):
         """Read 3D dataset with bounding box in space
@@ -833,7 +834,6 @@ class ifgramStack:
                                   'unwrapPhase-20161020_20161101'])
         """
         self.get_size(dropIfgram=False)
-        date12List = self.get_date12_list(dropIfgram=False)
 
         # convert input datasetName into list
         if datasetName is None:
@@ -856,22 +856,35 @@ class ifgramStack:
                 else:
                     dateFlag[:] = True
             else:
+                # date12 list is needed only to locate the input individual ifgrams
+                date12List = self.get_date12_list(dropIfgram=False)
                 for e in datasetName:
                     dateFlag[date12List.index(e)] = True
 
             # get index in space/2-3 dimension
             if box is None:
                 box = (0, 0, self.width, self.length)
+            # clip box to the dataset extent, as the h5py slicing does
+            y0, y1 = slice(box[1], box[3]).indices(self.length)[:2]
+            x0, x1 = slice(box[0], box[2]).indices(self.width)[:2]
+            box = (x0, y0, max(x1, x0), max(y1, y0))
 
             # read
-            if np.sum(dateFlag) < 50:
-                data = ds[dateFlag,
-                          box[1]:box[3],
-                          box[0]:box[2]]
-            else:
-                data = ds[:,
-                          box[1]:box[3],
-                          box[0]:box[2]][dateFlag]
+            # directly into the pre-allocated output array, one run of consecutive ifgrams at a time,
+            # to skip the un-selected ifgrams without a temporary array for the whole stack
+            ifgram_idx = np.flatnonzero(dateFlag)
+            data = np.empty((ifgram_idx.size, box[3] - box[1], box[2] - box[0]), dtype=ds.dtype)
+            if data.size > 0:
+                run_list = np.split(ifgram_idx, np.flatnonzero(np.diff(ifgram_idx) > 1) + 1)
+                i0 = 0
+                for run in run_list:
+                    i1 = i0 + run.size
+                    ds.read_direct(data,
+                                   source_sel=np.s_[run[0]:run[-1]+1,
+                                                    box[1]:box[3],
+                                                    box[0]:box[2]],
+                                   dest_sel=np.s_[i0:i1])
+                    i0 = i1
 
             if any(i == 1 for i in data.shape):
                 data = np.squeeze(data)
@@ -995,8 +1008,8 @@ class ifgramStack:
             for i in range(num2read):
                 prog_bar.update(i+1, suffix='{}/{}'.format(i+1, num2read))
                 data = dset[idx2read[i], :, :]
-                mask[data == 0.] = 0
-                mask[np.isnan(data)] = 0
+                # boolean and-reduction, instead of two fancy-indexed assignments
+                mask &= (data != 0.) & ~np.isnan(data)
             prog_bar.close()
         return mask
 
@@ -1052,10 +1065,9 @@ class ifgramStack:
                 if 'unwrapPhase' in datasetName:
                     # spatial referencing
                     if ref_val is not None:
-                        data -= np.tile(ref_val.reshape(-1, 1, 1), (1, data.shape[1], data.shape[2]))
+                        data -= ref_val.reshape(-1, 1, 1)
                     # phase to phase velocity
-                    for j in range(data.shape[0]):
-                        data[j,:,:] *= (phase2range / tbase[j])
+                    data *= (phase2range / tbase).reshape(-1, 1, 1)
 
                 # use nanmean to better handle NaN values
                 dmean[r0:r1, :] = np.nanmean(data, axis=0)
@@ -1065,10 +1077,8 @@ class ifgramStack:
     def get_max_connection_number(self):
         date12_list = self.get_date12_list()
         A = self.get_design_matrix4timeseries(date12_list, refDate=0)[0]
-        num_conn = np.zeros(A.shape[0], dtype=np.int16)
-        for i in range(A.shape[0]):
-            Ai = A[i, :]
-            num_conn[i] = np.where(Ai == 1)[0] - np.where(Ai == -1)[0]
+        # column index of date2 (+1) minus date1 (-1) for all rows at once
+        num_conn = np.argmax(A, axis=1) - np.argmin(A, axis=1)
         return np.max(num_conn)
 
     # Functions for Unwrap error correction
@@ -1088,6 +1098,15 @@ class ifgramStack:
         # Date info
         date12_list = list(date12_list)
 
+        # index of ifgrams via dict lookup (1st occurrence, same as list.index())
+        # and the list of date2 for each date1, both computed once
+        date12_idx = {}
+        date2_dict = {}
+        for i, date12 in enumerate(date12_list):
+            date12_idx.setdefault(date12, i)
+            date1, date2 = date12.split('_')
+            date2_dict.setdefault(date1, []).append(date2)
+
         # calculate triangle_idx
         triangle_idx = []
         for ifgram1 in date12_list:
@@ -1095,22 +1114,16 @@ class ifgramStack:
             date1, date2 = ifgram1.split('_')
 
             # ifgram2 candidates (date1, date3)
-            date3_list = []
-            for ifgram2 in date12_list:
-                if date1 == ifgram2.split('_')[0] and ifgram2 != ifgram1:
-                    date3_list.append(ifgram2.split('_')[1])
+            date3_list = [i for i in date2_dict[date1] if i != date2]
 
             # ifgram2/3
-            if len(date3_list) > 0:
-                for date3 in date3_list:
-                    ifgram3 = '{}_{}'.format(date2, date3)
-                    if ifgram3 in date12_list:
-                        ifgram1 = '{}_{}'.format(date1, date2)
-                        ifgram2 = '{}_{}'.format(date1, date3)
-                        ifgram3 = '{}_{}'.format(date2, date3)
-                        triangle_idx.append([date12_list.index(ifgram1),
-                                             date12_list.index(ifgram2),
-                                             date12_list.index(ifgram3)])
+            for date3 in date3_list:
+                ifgram3 = '{}_{}'.format(date2, date3)
+                if ifgram3 in date12_idx:
+                    ifgram2 = '{}_{}'.format(date1, date3)
+                    triangle_idx.append([date12_idx[ifgram1],
+                                         date12_idx[ifgram2],
+                                         date12_idx[ifgram3]])
 
         if len(triangle_idx) == 0:
             print('\nWARNING: No triangles found from input date12_list:\n{}!\n'.format(date12_list))
@@ -1122,10 +1135,10 @@ class ifgramStack:
         # triangle_idx to C
         num_triangle = triangle_idx.shape[0]
         C = np.zeros((num_triangle, len(date12_list)), np.float32)
-        for i in range(num_triangle):
-            C[i, triangle_idx[i, 0]] = 1
-            C[i, triangle_idx[i, 1]] = -1
-            C[i, triangle_idx[i, 2]] = 1
+        row_idx = np.arange(num_triangle)
+        C[row_idx, triangle_idx[:, 0]] = 1
+        C[row_idx, triangle_idx[:, 1]] = -1
+        C[row_idx, triangle_idx[:, 2]] = 1
         return C
 
 
@@ -1153,19 +1166,25 @@ class ifgramStack:
         num_date = len(date_list)
 
         # tbase in the unit of years
-        date_format = ptime.get_date_str_format(date_list[0])
-        dates = np.array([dt.strptime(i, date_format) for i in date_list])
-        tbase = [i.days + i.seconds / (24 * 60 * 60) for i in (dates - dates[0])]
-        tbase = np.array(tbase, dtype=np.float32) / 365.25
+        dates = ptime.date_list2datetime64(date_list)
+        tbase = ((dates - dates[0]) / np.timedelta64(1, 'D')).astype(np.float32) / 365.25
+
+        # date index of all ifgrams, via dict lookup instead of list.index()
+        date_idx = {d: i for i, d in enumerate(date_list)}
+        ind1 = np.array([date_idx[i] for i in date1s], dtype=np.intp)
+        ind2 = np.array([date_idx[i] for i in date2s], dtype=np.intp)
 
         # calculate design matrix
         A = np.zeros((num_ifgram, num_date), np.float32)
-        B = np.zeros((num_ifgram, num_date), np.float32)
-        for i in range(num_ifgram):
-            ind1, ind2 = [date_list.index(d) for d in date12_list[i].split('_')]
-            A[i, ind1] = -1
-            A[i, ind2] = 1
-            B[i, ind1:ind2] = tbase[ind1+1:ind2+1] - tbase[ind1:ind2]
+        A[np.arange(num_ifgram), ind1] = -1
+        A[np.arange(num_ifgram), ind2] = 1
+
+        # B[i, ind1:ind2] = tbase[ind1+1:ind2+1] - tbase[ind1:ind2]
+        tbase_diff = np.zeros(num_date, np.float32)
+        tbase_diff[:-1] = np.diff(tbase)
+        col_idx = np.arange(num_date)
+        flag = (col_idx >= ind1[:, None]) & (col_idx < ind2[:, None])
+        B = flag * tbase_diff
 
         # Remove reference date as it can not be resolved
         if refDate != 'no':
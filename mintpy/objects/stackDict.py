@@ -21,6 +21,7 @@ except ImportError:
     raise ImportError('Could not import skimage!')
 
 from mintpy.objects import (
+    cluster,
     dataTypeDict,
     geometryDatasetNames,
     ifgramDatasetNames,
@@ -94,7 +95,7 @@ class ifgramStackDict:
         return dataType
 
     def write2hdf5(self, outputFile='ifgramStack.h5', access_mode='w', box=None, xstep=1, ystep=1,
-                   compression=None, extra_metadata=None):
+                   compression=None, extra_metadata=None, num_thread=1):
         """Save/write an ifgramStackDict object into an HDF5 file with the structure defined in:
 
         https://mintpy.readthedocs.io/en/latest/api/data_structure/#ifgramstack
@@ -103,6 +104,7 @@ class ifgramStackDict:
                     access_mode : str, access mode of output File, e.g. w, r+
                     box : tuple, subset range in (x0, y0, x1, y1)
                     extra_metadata : dict, extra metadata to be added into output file
+                    num_thread : int, number of threads to read the input files
         Returns:    outputFile
         """
 
@@ -141,15 +143,14 @@ class ifgramStackDict:
                                       chunks=True,
                                       compression=dsCompression)
 
+                # read the next few files in parallel threads while writing the current one,
+                # as reading from many individual files is I/O bound
+                read_kwargs = dict(box=box, xstep=xstep, ystep=ystep)
+                data_iter = cluster.prefetch_map(lambda obj: obj.read(dsName, **read_kwargs)[0],
+                                                 ((self.pairsDict[pair],) for pair in self.pairs),
+                                                 num_worker=num_thread)
                 prog_bar = ptime.progressBar(maxValue=self.numIfgram)
-                for i in range(self.numIfgram):
-                    # read
-                    ifgramObj = self.pairsDict[self.pairs[i]]
-                    data = ifgramObj.read(dsName,
-                                          box=box,
-                                          xstep=xstep,
-                                          ystep=ystep)[0]
-                    # write
+                for i, data in enumerate(data_iter):
                     ds[i, :, :] = data
                     prog_bar.update(i+1, suffix='{}_{}'.format(self.pairs[i][0],
                                                                self.pairs[i][1]))
@@ -512,9 +513,10 @@ class geometryDict:
         return self.metadata
 
     def write2hdf5(self, outputFile='geometryRadar.h5', access_mode='w', box=None, xstep=1, ystep=1,
-                   compression='lzf', extra_metadata=None):
+                   compression='lzf', extra_metadata=None, num_thread=1):
         """Save/write to HDF5 file with structure defined in:
             https://mintpy.readthedocs.io/en/latest/api/data_structure/#geometry
+        num_thread : int, number of threads to read the input bperp files
         """
         if len(self.datasetDict) == 0:
             print('No dataset file path in the object, skip HDF5 file writing.')
@@ -549,14 +551,13 @@ class geometryDict:
                                                              c=str(compression)))
 
                     print('read coarse grid baseline files and linear interpolate into full resolution ...')
+                    # read / interpolate the next few files in parallel threads while writing the current one
+                    read_kwargs = dict(full_shape=self.get_size(), box=box, xstep=xstep, ystep=ystep)
+                    data_iter = cluster.prefetch_map(lambda fname: read_isce_bperp_file(fname, **read_kwargs),
+                                                     ((self.datasetDict[dsName][i],) for i in self.dateList),
+                                                     num_worker=num_thread)
                     prog_bar = ptime.progressBar(maxValue=self.numDate)
-                    for i in range(self.numDate):
-                        fname = self.datasetDict[dsName][self.dateList[i]]
-                        data = read_isce_bperp_file(fname=fname,
-                                                    full_shape=self.get_size(),
-                                                    box=box,
-                                                    xstep=xstep,
-                                                    ystep=ystep)
+                    for i, data in enumerate(data_iter):
                         ds[i, :, :] = data
                         prog_bar.update(i+1, suffix=self.dateList[i])
                     prog_bar.close()
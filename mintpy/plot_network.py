@@ -110,6 +110,7 @@ def create_parser():
 def cmd_line_parse(iargs=None):
     parser = create_parser()
     inps = parser.parse_args(args=iargs)
+    inps.argv = iargs if iargs else sys.argv[1:]
 
     # check input file type
     if inps.file.endswith(('.h5','.he5')):
@@ -158,9 +159,10 @@ def read_network_info(inps):
 
     ## 1. Read date, pbase, date12 and coherence
     if ext == '.h5':
-        inps.date12List = ifgramStack(inps.file).get_date12_list(dropIfgram=False)
-        inps.dateList = ifgramStack(inps.file).get_date_list(dropIfgram=False)
-        inps.pbaseList = ifgramStack(inps.file).get_perp_baseline_timeseries(dropIfgram=False)
+        stack_obj = ifgramStack(inps.file)
+        inps.date12List = stack_obj.get_date12_list(dropIfgram=False)
+        inps.dateList = stack_obj.get_date_list(dropIfgram=False)
+        inps.pbaseList = stack_obj.get_perp_baseline_timeseries(dropIfgram=False)
         inps.cohList = ut.spatial_average(inps.file,
                                           datasetName=inps.dsetName,
                                           maskFile=inps.maskFile,
@@ -191,7 +193,7 @@ def read_network_info(inps):
     inps.dateList_drop = []
     inps.date12List_drop = []
     if ext == '.h5':
-        inps.date12List_keep = ifgramStack(inps.file).get_date12_list(dropIfgram=True)
+        inps.date12List_keep = stack_obj.get_date12_list(dropIfgram=True)
         inps.date12List_drop = sorted(list(set(inps.date12List) - set(inps.date12List_keep)))
         print('-'*50)
         print('number of interferograms marked as drop: {}'.format(len(inps.date12List_drop)))
@@ -210,7 +212,7 @@ def read_network_info(inps):
 def check_colormap(inps):
     """Check input colormaps."""
     # adjust color jump if no --cmap-vlist is input
-    if inps.cohList is not None and '--cmap-vlist' not in sys.argv:
+    if inps.cohList is not None and '--cmap-vlist' not in inps.argv:
         # use template value
         key = 'mintpy.network.minCoherence'
         if key in inps.template.keys():
@@ -6,7 +6,6 @@
 ############################################################
 
 
-import os
 import sys
 import argparse
 import numpy as np
@@ -208,9 +208,11 @@ def prepare_timeseries(outfile, unw_file, metadata, processor, baseline_dir=None
         for i in range(num_file):
             # read data using gdal
             ds = gdal.Open(unw_files[i], gdal.GA_ReadOnly)
-            data = np.array(ds.GetRasterBand(2).ReadAsArray())
+            data = ds.GetRasterBand(2).ReadAsArray()
 
-            f["timeseries"][i+1] = data * phase2range
+            # convert phase to range in place, to avoid allocating another array for each date
+            data *= phase2range
+            f["timeseries"][i+1] = data
             prog_bar.update(i+1, suffix=date12_list[i])
         prog_bar.close()
 
@@ -181,8 +181,7 @@ def change_timeseries_ref_date(ts_file, ref_date, outfile=None, max_memory=4.0,
         ts_data = readfile.read(ts_file, box=box)[0]
 
         print('referencing in time ...')
-        dshape = ts_data.shape
-        ts_data -= np.tile(ts_data[ref_idx, :, :].reshape(1, dshape[1], dshape[2]), (dshape[0], 1, 1))
+        ts_data -= ts_data[ref_idx, :, :]
 
         # writing
         block = (0, num_date, box[1], box[3], box[0], box[2])
@@ -192,7 +192,7 @@ def reference_file(inps):
     # did not use maskConnComp.h5 because not all input dataset has connectComponent info
     stack = ut.temporal_average(inps.file, datasetName='unwrapPhase', updateMode=True, outFile=False)[0]
     mask = np.multiply(~np.isnan(stack), stack != 0.)
-    if np.nansum(mask) == 0.0:
+    if not np.any(mask):
         raise ValueError('no pixel found with valid phase value in all datasets.')
 
     # Check 2 - input ref_y/x: location and validity
@@ -264,8 +264,9 @@ def reference_file(inps):
                 data, atr = readfile.read(inps.file)
                 if len(data.shape) == 3:
                     # 3D matrix
-                    for i in range(data.shape[0]):
-                        data[i, :, :] -= data[i, inps.ref_y, inps.ref_x]
+                    # copy the reference values first to avoid aliasing during the in-place broadcasting
+                    ref_val = np.array(data[:, inps.ref_y, inps.ref_x])
+                    data -= ref_val.reshape(-1, 1, 1)
 
                 else:
                     # 2D matrix
@@ -7,7 +7,6 @@
 
 
 import os
-import re
 import sys
 import argparse
 import datetime as dt
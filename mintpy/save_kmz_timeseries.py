@@ -415,42 +415,43 @@ def create_kml_region_document(inps, box_list, ts_obj, step):
 
         # 2.3 Create data folder for all points
         data_folder = KML.Folder(KML.name("Data"))
-        for i in range(0, length, step):
-            for j in range(0, width, step):
-                if mask[i, j]:  # add point if it's not marked as masked out
-                    lat = lats[i, j]
-                    lon = lons[i, j]
-                    row = rows[i, j]
-                    col = cols[i, j]
-                    ts = ts_data[:, i, j]
-                    v = vel[i, j]
-                    vc = vel_c[i, j]
-                    vstd = vel_std[i, j]
-                    tcoh = temp_coh[i, j]
-
-                    # 2.3.1 Create KML icon style element
-                    style = KML.Style(
-                        KML.IconStyle(
-                            KML.color(get_hex_color(vc, colormap, norm)),
-                            KML.scale(0.5),
-                            KML.Icon(KML.href("{}".format(dot_file)))
-                        )
-                    )
-
-                    # 2.3.2 Create KML point element
-                    point = KML.Point(KML.coordinates("{},{}".format(lon, lat)))
-
-                    js_data_string = generate_js_datastring(dates, inps.dygraph_file, num_date, ts)
-
-                    # 2.3.3 Create KML description element
-                    stats_info = get_description_string((lat, lon), (row, col), v, vstd, ts[-1], tcoh=tcoh)
-                    description = KML.description(stats_info, js_data_string)
-
-                    # 2.3.4 Crate KML Placemark element to hold style, description, and point elements
-                    placemark = KML.Placemark(style, description, point)
-
-                    # 2.3.5 Append each placemark element to the KML document object
-                    data_folder.append(placemark)
+        # add point only if it's not marked as masked out
+        # pre-filter the (subsampled) pixels in row-major order
+        row_idx, col_idx = np.nonzero(mask[::step, ::step])
+        for i, j in zip(row_idx * step, col_idx * step):
+            lat = lats[i, j]
+            lon = lons[i, j]
+            row = rows[i, j]
+            col = cols[i, j]
+            ts = ts_data[:, i, j]
+            v = vel[i, j]
+            vc = vel_c[i, j]
+            vstd = vel_std[i, j]
+            tcoh = temp_coh[i, j]
+
+            # 2.3.1 Create KML icon style element
+            style = KML.Style(
+                KML.IconStyle(
+                    KML.color(get_hex_color(vc, colormap, norm)),
+                    KML.scale(0.5),
+                    KML.Icon(KML.href("{}".format(dot_file)))
+                )
+            )
+
+            # 2.3.2 Create KML point element
+            point = KML.Point(KML.coordinates("{},{}".format(lon, lat)))
+
+            js_data_string = generate_js_datastring(dates, inps.dygraph_file, num_date, ts)
+
+            # 2.3.3 Create KML description element
+            stats_info = get_description_string((lat, lon), (row, col), v, vstd, ts[-1], tcoh=tcoh)
+            description = KML.description(stats_info, js_data_string)
+
+            # 2.3.4 Crate KML Placemark element to hold style, description, and point elements
+            placemark = KML.Placemark(style, description, point)
+
+            # 2.3.5 Append each placemark element to the KML document object
+            data_folder.append(placemark)
 
         # 2.4 Append data folder to KML document
         kml_document.append(data_folder)
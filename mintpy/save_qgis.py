@@ -200,7 +200,9 @@ def write_shape_file(fDict, shp_file, box=None):
                 with h5py.File(fDict['Geometry'], 'r') as geomid:
 
                     length = box[3] - box[1]
-                    width = box[2] - box[0]
+
+                    #Field names of the time-series
+                    ts_keys = ['D{0}'.format(date) for date in ts_obj.dateList]
 
                     #Start counter
                     counter = 1
@@ -210,30 +212,27 @@ def write_shape_file(fDict, shp_file, box=None):
                     for i in range(length):
                         line = i + box[1]
 
-                        # read data for the line
-                        ts = tsid['timeseries'][:, line, box[0]:box[2]].astype(np.float64)
+                        # read data for the line (in mm for displacement)
+                        ts = tsid['timeseries'][:, line, box[0]:box[2]].astype(np.float64) * 1000
                         coh = cohid['temporalCoherence'][line, box[0]:box[2]].astype(np.float64)
-                        vel = velid['velocity'][line, box[0]:box[2]].astype(np.float64)
-                        vel_std = velid['velocityStd'][line, box[0]:box[2]].astype(np.float64)
+                        vel = velid['velocity'][line, box[0]:box[2]].astype(np.float64) * 1000
+                        vel_std = velid['velocityStd'][line, box[0]:box[2]].astype(np.float64) * 1000
                         hgt = geomid['height'][line, box[0]:box[2]].astype(np.float64)
                         lat = lats[i, :].astype(np.float64)
                         lon = lons[i, :].astype(np.float64)
 
-                        for j in range(width):
-                            if mask[i, j] == 0:
-                                continue
+                        # loop over the valid pixels only
+                        for j in np.flatnonzero(mask[i, :]):
 
                             #Create metadata dict
                             rdict = { 'CODE'      : hex(counter)[2:].zfill(8),
                                       'HEIGHT'    : hgt[j],
                                       'H_STDEV'   : 0.,
-                                      'VEL'       : vel[j]*1000,
-                                      'V_STDEV'   : vel_std[j]*1000,
+                                      'VEL'       : vel[j],
+                                      'V_STDEV'   : vel_std[j],
                                       'COHERENCE' : coh[j],
                                       'EFF_AREA'  : 1}
-
-                            for ind, date in enumerate(ts_obj.dateList):
-                                rdict['D{0}'.format(date)] = ts[ind, j] * 1000
+                            rdict.update(zip(ts_keys, ts[:, j]))
 
                             #Create feature with definition
                             feature = ogr.Feature(layerDefn)
@@ -243,7 +242,8 @@ def write_shape_file(fDict, shp_file, box=None):
 
                             # update counter / progress bar
                             counter += 1
-                            prog_bar.update(counter, every=100, suffix='{}/{}'.format(counter, nValid))
+                            if counter % 100 == 0 or counter == nValid:
+                                prog_bar.update(counter, suffix='{}/{}'.format(counter, nValid))
                     prog_bar.close()
 
     print('finished writing to file: {}'.format(shp_file))
@@ -14,14 +14,12 @@ import glob
 import time
 import datetime
 import shutil
-import argparse
 import numpy as np
 
 import mintpy
 from mintpy.objects import sensor, RAMP_LIST
 from mintpy.utils import readfile, writefile, utils as ut
 from mintpy.defaults.template import STEP_LIST
-import mintpy.workflow   # dynamic import of modules for smallbaselineApp
 
 
 ##########################################################################
@@ -58,6 +56,9 @@ REFERENCE = """reference:
 
 
 def create_parser():
+    # import here, so that -v (print software version) does not load argparse
+    import argparse
+
     parser = argparse.ArgumentParser(description='Routine Time Series Analysis for Small Baseline InSAR Stack',
                                      formatter_class=argparse.RawTextHelpFormatter,
                                      epilog=REFERENCE+'\n'+EXAMPLE)
@@ -340,7 +341,8 @@ class TimeSeriesAnalysis:
 
         # run command line
         print('\nload_data.py', ' '.join(iargs))
-        mintpy.load_data.main(iargs)
+        from mintpy import load_data
+        load_data.main(iargs)
 
         # come back to working directory
         os.chdir(self.workDir)
@@ -390,7 +392,7 @@ class TimeSeriesAnalysis:
         net_fig = [os.path.join(self.workDir, i, 'network.pdf') for i in ['', 'pic']]
         try:
             net_fig = [i for i in net_fig if os.path.isfile(i)][0]
-        except:
+        except IndexError:
             net_fig = None
 
         # 1) output waterMask.h5 to simplify the detection/use of waterMask
@@ -412,7 +414,8 @@ class TimeSeriesAnalysis:
         # 2) modify network
         iargs = [stack_file, '-t', self.templateFile]
         print('\nmodify_network.py', ' '.join(iargs))
-        mintpy.modify_network.main(iargs)
+        from mintpy import modify_network
+        modify_network.main(iargs)
 
         # 3) plot network
         iargs = [stack_file, '-t', self.templateFile, '--nodisplay']
@@ -430,7 +433,8 @@ class TimeSeriesAnalysis:
             if ut.run_or_skip(out_file=net_fig,
                               in_file=[stack_file, coh_txt, self.templateFile],
                               check_readable=False) == 'run':
-                mintpy.plot_network.main(iargs)
+                from mintpy import plot_network
+                plot_network.main(iargs)
         else:
             print('mintpy.plot is turned OFF, skip plotting network.')
         return
@@ -448,7 +452,8 @@ class TimeSeriesAnalysis:
         if any('phase' in i.lower() for i in dsNames):
             iargs = [stack_file, '--nonzero', '-o', mask_file, '--update']
             print('\ngenerate_mask.py', ' '.join(iargs))
-            mintpy.generate_mask.main(iargs)
+            from mintpy import generate_mask
+            generate_mask.main(iargs)
 
         # 2) generate average spatial coherence
         if any('phase' in i.lower() for i in dsNames):
@@ -456,7 +461,8 @@ class TimeSeriesAnalysis:
         elif any('offset' in i.lower() for i in dsNames):
             iargs = [stack_file, '--dataset', 'offsetSNR', '-o', snr_file, '--update']
         print('\ntemporal_average.py', ' '.join(iargs))
-        mintpy.temporal_average.main(iargs)
+        from mintpy import temporal_average
+        temporal_average.main(iargs)
         return
 
 
@@ -477,7 +483,8 @@ class TimeSeriesAnalysis:
         if lookup_file is not None:
             iargs += ['--lookup', lookup_file]
         print('\nreference_point.py', ' '.join(iargs))
-        mintpy.reference_point.main(iargs)
+        from mintpy import reference_point
+        reference_point.main(iargs)
         return
 
 
@@ -493,13 +500,15 @@ class TimeSeriesAnalysis:
         pha_vel_file = os.path.join(self.workDir, 'avgPhaseVelocity.h5')
         iargs = [stack_file, '--dataset', 'unwrapPhase', '-o', pha_vel_file, '--update']
         print('\ntemporal_average.py', ' '.join(iargs))
-        mintpy.temporal_average.main(iargs)
+        from mintpy import temporal_average
+        temporal_average.main(iargs)
 
         # 2) calculate the number of interferogram triplets with non-zero integer ambiguity
         water_mask_file = os.path.join(self.workDir, 'waterMask.h5')
         iargs = [stack_file, '--water-mask', water_mask_file, '--action', 'calculate', '--update']
         print('\nunwrap_error_phase_closure.py', ' '.join(iargs))
-        mintpy.unwrap_error_phase_closure.main(iargs)
+        from mintpy import unwrap_error_phase_closure
+        unwrap_error_phase_closure.main(iargs)
         return
 
 
@@ -519,22 +528,26 @@ class TimeSeriesAnalysis:
 
         if method == 'bridging':
             print('\nunwrap_error_bridging.py', ' '.join(iargs_bridge))
-            mintpy.unwrap_error_bridging.main(iargs_bridge)
+            from mintpy import unwrap_error_bridging
+            unwrap_error_bridging.main(iargs_bridge)
 
         elif method == 'phase_closure':
             print('\nunwrap_error_phase_closure.py', ' '.join(iargs_closure))
-            mintpy.unwrap_error_phase_closure.main(iargs_closure)
+            from mintpy import unwrap_error_phase_closure
+            unwrap_error_phase_closure.main(iargs_closure)
 
         elif method == 'bridging+phase_closure':
             iargs_bridge += ['-i', 'unwrapPhase',
                              '-o', 'unwrapPhase_bridging']
             print('\nunwrap_error_bridging.py', ' '.join(iargs_bridge))
-            mintpy.unwrap_error_bridging.main(iargs_bridge)
+            from mintpy import unwrap_error_bridging
+            unwrap_error_bridging.main(iargs_bridge)
 
             iargs_closure += ['-i', 'unwrapPhase_bridging',
                               '-o', 'unwrapPhase_bridging_phaseClosure']
             print('\nunwrap_error_phase_closure.py', ' '.join(iargs_closure))
-            mintpy.unwrap_error_phase_closure.main(iargs_closure)
+            from mintpy import unwrap_error_phase_closure
+            unwrap_error_phase_closure.main(iargs_closure)
 
         else:
             raise ValueError('un-recognized method: {}'.format(method))
@@ -552,7 +565,8 @@ class TimeSeriesAnalysis:
         # 1) invert ifgramStack for time-series
         iargs = [stack_file, '-t', self.templateFile, '--update']
         print('\nifgram_inversion.py', ' '.join(iargs))
-        mintpy.ifgram_inversion.main(iargs)
+        from mintpy import ifgram_inversion
+        ifgram_inversion.main(iargs)
 
         # 2) get reliable pixel mask: maskTempCoh.h5
         self.generate_temporal_coherence_mask()
@@ -593,7 +607,8 @@ class TimeSeriesAnalysis:
         print('run or skip: {}'.format(flag))
 
         if flag == 'run':
-            mintpy.generate_mask.main(iargs)
+            from mintpy import generate_mask
+            generate_mask.main(iargs)
             # update configKeys
             atr = {}
             for key in config_keys:
@@ -719,7 +734,8 @@ class TimeSeriesAnalysis:
             iargs = [in_file, geom_file, '-o', out_file]
             print('\nlocal_oscilator_drift.py', ' '.join(iargs))
             if ut.run_or_skip(out_file=out_file, in_file=in_file) == 'run':
-                mintpy.local_oscilator_drift.main(iargs)
+                from mintpy import local_oscilator_drift
+                local_oscilator_drift.main(iargs)
         else:
             atr = readfile.read_attribute(in_file)
             sat = atr.get('PLATFORM', None)
@@ -777,7 +793,8 @@ class TimeSeriesAnalysis:
                 print('tropospheric delay correction with height-correlation approach')
                 print('\ntropo_phase_elevation.py', ' '.join(iargs))
                 if ut.run_or_skip(out_file=out_file, in_file=in_file) == 'run':
-                    mintpy.tropo_phase_elevation.main(iargs)
+                    from mintpy import tropo_phase_elevation
+                    tropo_phase_elevation.main(iargs)
 
             # Weather re-analysis data with iterative tropospheric decomposition (GACOS)
             # Yu et al., 2017; 2018a; 2018b
@@ -787,7 +804,8 @@ class TimeSeriesAnalysis:
                 print('tropospheric delay correction with gacos approach')
                 print('\ntropo_gacos.py', ' '.join(iargs))
                 if ut.run_or_skip(out_file=out_file, in_file=in_file) == 'run':
-                    mintpy.tropo_gacos.main(iargs)
+                    from mintpy import tropo_gacos
+                    tropo_gacos.main(iargs)
 
             # Weather Re-analysis Data (Jolivet et al., 2011;2014)
             elif method == 'pyaps':
@@ -801,7 +819,8 @@ class TimeSeriesAnalysis:
                         print('--------------------------------------------')
                         print('Use existed tropospheric delay file: {}'.format(tropo_file))
                         print('\ndiff.py', ' '.join(iargs))
-                        mintpy.diff.main(iargs)
+                        from mintpy import diff
+                        diff.main(iargs)
                     else:
                         if tropo_model in ['ERA5']:
                             from mintpy import tropo_pyaps3
@@ -829,7 +848,8 @@ class TimeSeriesAnalysis:
             print('Remove for each acquisition a phase ramp: {}'.format(method))
             iargs = [in_file, '-s', method, '-m', mask_file, '-o', out_file, '--update']
             print('\nremove_ramp.py', ' '.join(iargs))
-            mintpy.remove_ramp.main(iargs)
+            from mintpy import remove_ramp
+            remove_ramp.main(iargs)
         else:
             print('No phase ramp removal.')
         return
@@ -849,7 +869,8 @@ class TimeSeriesAnalysis:
             if self.template['mintpy.topographicResidual.pixelwiseGeometry']:
                 iargs += ['-g', geom_file]
             print('\ndem_error.py', ' '.join(iargs))
-            mintpy.dem_error.main(iargs)
+            from mintpy import dem_error
+            dem_error.main(iargs)
 
         else:
             print('No topographic residual correction.')
@@ -862,7 +883,8 @@ class TimeSeriesAnalysis:
         if os.path.isfile(res_file):
             iargs = [res_file, '-t', self.templateFile]
             print('\ntimeseries_rms.py', ' '.join(iargs))
-            mintpy.timeseries_rms.main(iargs)
+            from mintpy import timeseries_rms
+            timeseries_rms.main(iargs)
         else:
             print('No residual phase file found! Skip residual RMS analysis.')
         return
@@ -876,7 +898,8 @@ class TimeSeriesAnalysis:
             for in_file in in_files:
                 iargs += [in_file]
             print('\nreference_date.py', ' '.join(iargs))
-            mintpy.reference_date.main(iargs)
+            from mintpy import reference_date
+            reference_date.main(iargs)
         else:
             print('No reference date change.')
         return
@@ -889,7 +912,8 @@ class TimeSeriesAnalysis:
 
         iargs = [ts_file, '-t', self.templateFile, '-o', vel_file, '--update']
         print('\ntimeseries2velocity.py', ' '.join(iargs))
-        mintpy.timeseries2velocity.main(iargs)
+        from mintpy import timeseries2velocity
+        timeseries2velocity.main(iargs)
 
         # Velocity from estimated tropospheric delays
         tropo_model = self.template['mintpy.troposphericDelay.weatherModel'].upper()
@@ -904,7 +928,7 @@ class TimeSeriesAnalysis:
             atr = readfile.read_attribute(vel_file)
             iargs += ['--ref-date', atr['REF_DATE'], '--ref-yx', atr['REF_Y'], atr['REF_X']]
             print('\ntimeseries2velocity.py', ' '.join(iargs))
-            mintpy.timeseries2velocity.main(iargs)
+            timeseries2velocity.main(iargs)
         return
 
 
@@ -922,7 +946,8 @@ class TimeSeriesAnalysis:
                 in_files = [geom_file, 'temporalCoherence.h5', 'avgSpatialCoh.h5', ts_file, 'velocity.h5']
                 iargs = in_files + ['-l', lookup_file, '-t', self.templateFile, '--outdir', out_dir, '--update']
                 print('\ngeocode.py', ' '.join(iargs))
-                mintpy.geocode.main(iargs)
+                from mintpy import geocode
+                geocode.main(iargs)
 
                 # 2. generate reliable pixel mask in geo coordinate
                 geom_file = os.path.join(out_dir, 'geo_{}'.format(os.path.basename(geom_file)))
@@ -938,7 +963,8 @@ class TimeSeriesAnalysis:
                 print('\ngenerate_mask.py', ' '.join(iargs))
 
                 if ut.run_or_skip(out_file=mask_file, in_file=tcoh_file) == 'run':
-                    mintpy.generate_mask.main(iargs)
+                    from mintpy import generate_mask
+                    generate_mask.main(iargs)
             else:
                 print('dataset is geocoded, skip geocoding and continue.')
         else:
@@ -970,7 +996,8 @@ class TimeSeriesAnalysis:
             kmz_file = kmz_files[0] if len(kmz_files) > 0 else None
 
             if ut.run_or_skip(out_file=kmz_file, in_file=vel_file, check_readable=False) == 'run':
-                mintpy.save_kmz.main(iargs)
+                from mintpy import save_kmz
+                save_kmz.main(iargs)
 
         else:
             print('save velocity to Google Earth format is OFF.')
@@ -1013,7 +1040,8 @@ class TimeSeriesAnalysis:
             hdfeos5_file = hdfeos5_files[0] if len(hdfeos5_files) > 0 else None
 
             if ut.run_or_skip(out_file=hdfeos5_file, in_file=[ts_file, tcoh_file, scoh_file, mask_file, geom_file]) == 'run':
-                mintpy.save_hdfeos5.main(iargs)
+                from mintpy import save_hdfeos5
+                save_hdfeos5.main(iargs)
 
         else:
             print('save time-series to HDF-EOS5 format is OFF.')
@@ -1174,9 +1202,10 @@ class TimeSeriesAnalysis:
 
         # run view
         start_time = time.time()
+        from mintpy import view
         for iargs in iargs_list:
             print('view.py', ' '.join(iargs))
-            mintpy.view.main(iargs)
+            view.main(iargs)
 
         # copy text files to pic
         print('copy *.txt files into ./pic directory.')
@@ -1229,8 +1258,13 @@ class TimeSeriesAnalysis:
 
 ##########################################################################
 def main(iargs=None):
-    start_time = time.time()
+    # -v (print software version): skip parsing / template checking
+    if iargs in [['-v'], ['--version']]:
+        print(mintpy.version.release_description)
+        return
+
     inps = cmd_line_parse(iargs)
+    start_time = time.time()
 
     app = TimeSeriesAnalysis(inps.customTemplateFile, inps.workDir)
     app.open()
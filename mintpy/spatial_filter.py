@@ -10,6 +10,7 @@
 import os
 import sys
 import argparse
+from functools import lru_cache
 
 try:
     from skimage import filters, feature, morphology
@@ -17,10 +18,14 @@ except ImportError:
     raise ImportError('Could not import skimage!')
 
 import numpy as np
-from scipy import ndimage
+from scipy import ndimage, signal
 from mintpy.utils import readfile, writefile
 
 
+# filters applied to all 2D matrices of a 3D matrix at once
+STACK_FILTER_TYPES = ['lowpass_avg', 'highpass_avg', 'lowpass_gaussian', 'highpass_gaussian']
+
+
 ################################################################################################
 REFERENCE = """references:
   Bekaert, David PS, et al. "InSAR-based detection method for mapping and monitoring slow-moving
@@ -73,10 +78,88 @@ def cmd_line_parse(iargs=None):
 
 
 ################################################################################################
+def uniform_filter(data, size):
+    """Average (boxcar) filter as two separable 1D passes, instead of the 2D convolution
+    with a normalized (size, size) kernel of ones, i.e. O(size) instead of O(size^2) per pixel.
+    Parameters: data - 2D / 3D np.ndarray, matrix to be filtered in the last two dimensions
+                size - int, kernel size
+    Returns:    data_filt - 2D / 3D np.ndarray, same as ndimage.convolve(data, np.ones((size, size))/size**2)
+                            for each 2D matrix
+    """
+    # no filtering along the 1st dimension for 3D matrix, i.e. time / ifgram
+    num_dim = data.ndim - 2
+
+    # NaN would propagate along the whole row / column in the running sums of the separable passes
+    if np.isnan(data).any():
+        kernel = np.ones([1] * num_dim + [size] * 2, dtype=np.float32) / size**2
+        return ndimage.convolve(data, kernel)
+
+    # shift the origin for even sizes to match the kernel centering of ndimage.convolve()
+    return ndimage.uniform_filter(data,
+                                  size=[1] * num_dim + [size] * 2,
+                                  origin=[0] * num_dim + [size % 2 - 1] * 2)
+
+
+def gaussian_filter(data, sigma):
+    """Gaussian filter as two separable 1D passes in the input precision,
+    same as skimage.filters.gaussian() for float input, without its conversion to float64.
+    Parameters: data  - 2D / 3D np.ndarray, matrix to be filtered in the last two dimensions
+                sigma - float, standard deviation of the gaussian kernel
+    Returns:    data_filt - 2D / 3D np.ndarray in float32 or float64
+    """
+    if not np.issubdtype(data.dtype, np.floating):
+        data = np.array(data, dtype=np.float32)
+    # no filtering along the 1st dimension for 3D matrix, i.e. time / ifgram
+    sigma = [0] * (data.ndim - 2) + [sigma] * 2
+    return ndimage.gaussian_filter(data, sigma=sigma, mode='nearest', truncate=4.0)
+
+
+def convolve(data, kernel):
+    """2D convolution via FFT, same as ndimage.convolve() with its default 'reflect' boundary,
+    i.e. O(log N) instead of O(kernel size) operations per pixel for large kernels.
+    Parameters: data   - 2D np.ndarray, matrix to be filtered
+                kernel - 2D np.ndarray in odd size, convolution kernel
+    Returns:    data_filt - 2D np.ndarray, filtered matrix in the same size as data
+    """
+    # NaN would propagate to the whole matrix in the frequency domain
+    if np.isnan(data).any():
+        return ndimage.convolve(data, kernel)
+
+    # symmetric padding in numpy == reflect mode in ndimage
+    pad_width = [(i // 2, i - 1 - i // 2) for i in kernel.shape]
+    data_pad = np.pad(data, pad_width, mode='symmetric')
+    return signal.fftconvolve(data_pad, kernel, mode='valid')
+
+
+@lru_cache(maxsize=8)
+def get_kernel(filter_type, filter_par):
+    """Get the (normalized) convolution kernel(s) for the double_difference filter.
+    Cached, so that filtering a 3D stack slice by slice builds the kernel only once,
+    thus, the returned kernels are read-only as they are shared by all callers.
+    Parameters: filter_type - str, double_difference
+                filter_par  - tuple of 2 int, local and regional kernel radius
+    Returns:    kernel      - tuple of 2 np.ndarray in float32
+    """
+    if filter_type == 'double_difference':
+        kernel = []
+        for radius in filter_par:
+            kernel_i = morphology.disk(radius, np.float32)
+            kernel_i /= kernel_i.sum()
+            kernel_i.flags.writeable = False
+            kernel.append(kernel_i)
+        kernel = tuple(kernel)
+
+    else:
+        raise ValueError('No convolution kernel for filter type: '+filter_type)
+
+    return kernel
+
+
 def filter_data(data, filter_type, filter_par=None):
     """Filter 2D matrix with selected filter
     Inputs:
         data        : 2D np.array, matrix to be filtered
+                      3D np.array for filter types in STACK_FILTER_TYPES, filtered in the last two dimensions
         filter_type : string, filter type
         filter_par  : string, optional, parameter for low/high pass filter
                       for low/highpass_avg, it's kernel size in int
@@ -94,20 +177,16 @@ def filter_data(data, filter_type, filter_par=None):
         data_filt = feature.canny(data)
 
     elif filter_type == "lowpass_avg":
-        p = int(filter_par)
-        kernel = np.ones((p, p), np.float32)/(p*p)
-        data_filt = ndimage.convolve(data, kernel)
+        data_filt = uniform_filter(data, int(filter_par))
     elif filter_type == "highpass_avg":
-        p = int(filter_par)
-        kernel = np.ones((p, p), np.float32)/(p*p)
-        lp_data = ndimage.convolve(data, kernel)
-        data_filt = data - lp_data
+        lp_data = uniform_filter(data, int(filter_par))
+        data_filt = np.subtract(data, lp_data, out=lp_data)
 
     elif filter_type == "lowpass_gaussian":
-        data_filt = filters.gaussian(data, sigma=filter_par)
+        data_filt = gaussian_filter(data, sigma=filter_par)
     elif filter_type == "highpass_gaussian":
-        lp_data = filters.gaussian(data, sigma=filter_par)
-        data_filt = data - lp_data
+        lp_data = gaussian_filter(data, sigma=filter_par)
+        data_filt = np.subtract(data, lp_data, out=lp_data)
 
     elif filter_type == "double_difference":
         """Amplifies the local deformation signal by reducing the influence
@@ -121,15 +200,16 @@ def filter_data(data, filter_type, filter_par=None):
         filter_par argument.
         """
 
-        kernel = morphology.disk(filter_par[0], np.float32)
-        kernel = kernel / kernel.flatten().sum()
-        local_filt = ndimage.convolve(data, kernel)
-
-        kernel = morphology.disk(filter_par[1], np.float32)
-        kernel = kernel / kernel.flatten().sum()
-        regional_filt = ndimage.convolve(data, kernel)
+        # convolution is linear: one pass with the difference of the two (centered) kernels
+        local_kernel, regional_kernel = get_kernel(filter_type, tuple(filter_par))
+        size = max(local_kernel.shape[0], regional_kernel.shape[0])
+        kernel = np.zeros((size, size), dtype=np.float32)
+        for kernel_i, sign in zip([regional_kernel, local_kernel], [1, -1]):
+            x0 = (size - kernel_i.shape[0]) // 2
+            x1 = x0 + kernel_i.shape[0]
+            kernel[x0:x1, x0:x1] += sign * kernel_i
 
-        data_filt = regional_filt - local_filt
+        data_filt = convolve(data, kernel)
 
     else:
         raise Exception('Un-recognized filter type: '+filter_type)
@@ -197,7 +277,11 @@ def filter_file(fname, ds_names=None, filter_type='lowpass_gaussian', filter_par
         # read
         data = readfile.read(fname, datasetName=ds_name, print_msg=False)[0]
         # filter
-        if len(data.shape) == 3:
+        if len(data.shape) == 3 and filter_type in STACK_FILTER_TYPES:
+            # filter all 2D matrices at once
+            print(msg + '...')
+            data = filter_data(data, filter_type, filter_par)
+        elif len(data.shape) == 3:
             num_loop = data.shape[0]
             for i in range(num_loop):
                 data[i, :, :] = filter_data(data[i, :, :], filter_type, filter_par)
@@ -67,7 +67,8 @@ def main(iargs=None):
         weight = np.exp(-0.5 * (tbase_diff**2) / (inps.time_win**2))
         weight /= np.sum(weight)
         # Smooth the current acquisition
-        ts_data_filt[i, :] = np.sum(ts_data * weight, axis=0)
+        # weighted sum via dot product, without the (num_date, num_pixel) temporary array
+        ts_data_filt[i, :] = np.dot(weight.flatten(), ts_data)
         prog_bar.update(i+1, suffix=obj.dateList[i])
     prog_bar.close()
     del ts_data
@@ -59,6 +59,9 @@ EXAMPLE = """example:
 
   # complex time functions
   timeseries2velocity.py timeseries_ERA5_ramp_demErr.h5 --poly 3 --period 1 0.5 --step 20170910
+
+  # parallel processing with dask
+  timeseries2velocity.py timeseries_ERA5_demErr.h5 --bootstrap -c local --num-worker 4
 """
 
 DROP_DATE_TXT = """exclude_date.txt:
@@ -126,6 +129,7 @@ def create_parser():
 
     # computing
     parser = arg_group.add_memory_argument(parser)
+    parser = arg_group.add_parallel_argument(parser)
 
     return parser
 
@@ -152,6 +156,12 @@ def cmd_line_parse(iargs=None):
     if inps.template_file:
         inps = read_template2inps(inps.template_file, inps)
 
+    # --cluster and --num-worker option
+    inps.numWorker = str(cluster.DaskCluster.format_num_worker(inps.cluster, inps.numWorker))
+    if inps.cluster and inps.numWorker == '1':
+        print('WARNING: number of workers is 1, turn OFF parallel processing and continue')
+        inps.cluster = None
+
     return inps
 
 
@@ -180,9 +190,18 @@ def read_template2inps(template_file, inps=None):
             elif key in ['bootstrapCount']:
                 iDict[key] = int(value)
 
-    key = 'mintpy.compute.maxMemory'
-    if key in template.keys() and template[key]:
-        inps.maxMemory = float(template[key])
+    # computing configurations
+    dask_key_prefix = 'mintpy.compute.'
+    keyList = [i for i in list(iDict.keys()) if dask_key_prefix+i in template.keys()]
+    for key in keyList:
+        value = template[dask_key_prefix+key]
+        if key in ['cluster', 'config']:
+            iDict[key] = value
+        elif value:
+            if key in ['numWorker']:
+                iDict[key] = str(value)
+            elif key in ['maxMemory']:
+                iDict[key] = float(value)
 
     return inps
 
@@ -333,7 +352,7 @@ def read_inps2model(inps):
 
 
 ############################################################################
-def estimate_time_func(date_list, dis_ts, model):
+def estimate_time_func(date_list, dis_ts, model, G=None):
     """
     Deformation model estimator, using a suite of linear, periodic, step function(s).
 
@@ -347,29 +366,190 @@ def estimate_time_func(date_list, dis_ts, model):
                      'step'       : ['20061014'], # list of str, date(s) in YYYYMMDD.
                      ...
                      }
+                G         - 2D np.ndarray, pre-computed design matrix in size of (num_date, num_par), optional
     Returns:    G         - 2D np.ndarray, design matrix           in size of (num_date, num_par)
                 m         - 2D np.ndarray, parameter solution      in size of (num_par, num_pixel)
                 e2        - 1D np.ndarray, sum of squared residual in size of (num_pixel,)
     """
 
-    G = timeseries.get_design_matrix4time_func(date_list, model)
+    if G is None:
+        G = timeseries.get_design_matrix4time_func(date_list, model)
 
     # least squares solver
     # Opt. 1: m = np.linalg.pinv(G).dot(dis_ts)
     # Opt. 2: m = scipy.linalg.lstsq(G, dis_ts, cond=1e-15)[0]
     # Numpy is not used because it can not handle NaN value in dis_ts
-    m, e2 = linalg.lstsq(G, dis_ts, cond=None)[:2]
+    num_date = G.shape[0]
+    tile_size = max(int(2**20 / num_date), 1)
+    if dis_ts.ndim == 2 and dis_ts.shape[1] > tile_size:
+        # solve in tiles of pixels (~4 MB in float32),
+        # to keep the working set in the CPU cache for large patches
+        num_pixel = dis_ts.shape[1]
+        m = np.zeros((G.shape[1], num_pixel), dtype=dis_ts.dtype)
+        e2_list = []
+        for c0 in range(0, num_pixel, tile_size):
+            c1 = min(c0 + tile_size, num_pixel)
+            m[:, c0:c1], e2i = linalg.lstsq(G, dis_ts[:, c0:c1], cond=None)[:2]
+            e2_list.append(e2i)
+        e2 = np.concatenate(e2_list)
+
+    else:
+        m, e2 = linalg.lstsq(G, dis_ts, cond=None)[:2]
 
     return G, m, e2
 
 
+def run_timeseries2time_func_patch(ts_file, date_list, drop_date, model, box, G=None,
+                                   ref_date=None, ref_yx=None, bootstrap=False, bootstrap_count=400):
+    """Estimate the time functions for one patch of the time-series file.
+
+    Parameters: ts_file         - str, path of time-series file
+                date_list       - list of str, dates used for the estimation in YYYYMMDD format
+                drop_date       - 1D np.ndarray in bool in size of (num_date_all), flag of dates to read
+                model           - dict, dict of time functions
+                box             - tuple of 4 int in (x0, y0, x1, y1) for the area of interest
+                G               - 2D np.ndarray in size of (num_date, num_param), design matrix,
+                                  which is the same for all patches, thus pre-computed once if given
+                ref_date        - str, reference date, for file w/o reference info, e.g. ERA5.h5
+                ref_yx          - tuple of 2 int, reference point, for file w/o reference info
+                bootstrap       - bool, estimate the mean / STD of the estimator via bootstrapping
+                bootstrap_count - int, number of iterations for bootstrapping
+    Returns:    m / m_std       - 3D np.ndarray in float32 in size of (num_param, box_len, box_wid),
+                                  time function parameters (and their Std. Dev.)
+                mask            - 2D np.ndarray in bool in size of (box_len, box_wid), mask of valid pixels
+                box             - tuple of 4 int in (x0, y0, x1, y1) for the area of interest
+    """
+    box_wid = box[2] - box[0]
+    box_len = box[3] - box[1]
+    num_pixel = box_len * box_wid
+    num_date = len(date_list)
+    dates = np.array(date_list)
+    if G is None:
+        G = timeseries.get_design_matrix4time_func(date_list, model)
+    num_param = G.shape[1]
+
+    # initiate output
+    m = np.zeros((num_param, num_pixel), dtype=dataType)
+    m_std = np.zeros((num_param, num_pixel), dtype=dataType)
+
+    # read input
+    print('reading data from file {} ...'.format(ts_file))
+    ts_data, atr = readfile.read(ts_file, box=box)
+    # referencing in time and space
+    # for file w/o reference info. e.g. ERA5.h5
+    if ref_date:
+        print('referecing to date: {}'.format(ref_date))
+        ref_ind = date_list.index(ref_date)
+        ts_data -= ts_data[ref_ind, :, :]
+    if ref_yx:
+        print('referencing to point (y, x): ({}, {})'.format(ref_yx[0], ref_yx[1]))
+        ref_box = (ref_yx[1], ref_yx[0], ref_yx[1]+1, ref_yx[0]+1)
+        ref_val = readfile.read(ts_file, box=ref_box)[0]
+        ts_data -= ref_val.reshape(ts_data.shape[0], 1, 1)
+
+    ts_data = ts_data[drop_date, :, :].reshape(num_date, -1)
+    if atr.get('UNIT', 'm') == 'mm':
+        ts_data *= 1./1000.
+
+    # mask invalid pixels
+    print('skip pixels with zero/nan value in all acquisitions')
+    ts_stack = np.nanmean(ts_data, axis=0)
+    mask = np.multiply(~np.isnan(ts_stack), ts_stack!=0.)
+    del ts_stack
+
+    ts_data = ts_data[:, mask]
+    num_pixel2inv = int(np.sum(mask))
+    print('number of pixels to invert: {} out of {} ({:.1f}%)'.format(
+        num_pixel2inv, num_pixel, num_pixel2inv/num_pixel*100))
+
+    # return directly if no valid pixel found
+    if num_pixel2inv == 0:
+        m = m.reshape(num_param, box_len, box_wid)
+        m_std = m_std.reshape(num_param, box_len, box_wid)
+        mask = mask.reshape(box_len, box_wid)
+        return m, m_std, mask, box
+
+
+    ### estimation / solve Gm = d
+
+    if bootstrap:
+        ## option 1 - least squares with bootstrapping
+        # Bootstrapping is a resampling method which can be used to estimate properties
+        # of an estimator. The method relies on independently sampling the data set with
+        # replacement.
+
+        try:
+            from sklearn.utils import resample
+        except ImportError:
+            raise ImportError('can not import scikit-learn!')
+        print('using bootstrap resampling {} times ...'.format(bootstrap_count))
+
+        # calc model of all bootstrap sampling
+        m_boot = np.zeros((bootstrap_count, num_param, num_pixel2inv), dtype=dataType)
+        prog_bar = ptime.progressBar(maxValue=bootstrap_count)
+        for i in range(bootstrap_count):
+            # bootstrap resampling
+            boot_ind = resample(np.arange(num_date),
+                                replace=True,
+                                n_samples=num_date)
+            boot_ind.sort()
+
+            # estimation
+            m_boot[i] = estimate_time_func(dates[boot_ind].tolist(),
+                                           ts_data[boot_ind],
+                                           model)[1]
+
+            prog_bar.update(i+1, suffix='iteration {} / {}'.format(i+1, bootstrap_count))
+        prog_bar.close()
+        del ts_data
+
+        # get mean/std among all bootstrap sampling
+        print('calculate mean and standard deviation of bootstrap estimations')
+        m[:, mask] = m_boot.mean(axis=0).reshape(num_param, -1)
+        m_std[:, mask] = m_boot.std(axis=0).reshape(num_param, -1)
+        del m_boot
+
+
+    else:
+        ## option 2 - least squares with uncertainty propagation
+
+        print('estimate time functions via linalg.lstsq ...')
+        G, m[:, mask], e2 = estimate_time_func(date_list,
+                                               ts_data,
+                                               model,
+                                               G=G)
+        del ts_data
+
+        ## Compute the covariance matrix for model parameters: Gm = d
+        # C_m_hat = (G.T * C_d^-1, * G)^-1  # the most generic form
+        #         = sigma^2 * (G.T * G)^-1  # assuming the obs error is normally distributed in time.
+        # Based on the law of integrated expectation, we estimate the obs sigma^2 using
+        # the OLS estimation residual e_hat_i = d_i - d_hat_i
+        # sigma^2 = sigma_hat^2 * N / (N - P)
+        #         = (e_hat.T * e_hat) / (N - P)  # sigma_hat^2 = (e_hat.T * e_hat) / N
+
+        G_inv = linalg.inv(np.dot(G.T, G))
+        m_var = e2.reshape(1, -1) / (num_date - num_param)
+        m_std[:, mask] = np.sqrt(np.diag(G_inv).reshape(-1, 1) * m_var)
+
+        ## for linear velocity, the STD can also be calculated 
+        # using Eq. (10) from Fattahi and Amelung (2015, JGR)
+        # ts_diff = ts_data - np.dot(G, m)
+        # t_diff = G[:, 1] - np.mean(G[:, 1])
+        # vel_std = np.sqrt(np.sum(ts_diff ** 2, axis=0) / np.sum(t_diff ** 2)  / (num_date - 2))
+
+    m = m.reshape(num_param, box_len, box_wid)
+    m_std = m_std.reshape(num_param, box_len, box_wid)
+    mask = mask.reshape(box_len, box_wid)
+    return m, m_std, mask, box
+
+
 def run_timeseries2time_func(inps):
 
     # basic info
     atr = readfile.read_attribute(inps.timeseries_file)
     length, width = int(atr['LENGTH']), int(atr['WIDTH'])
     num_date = inps.numDate
-    dates = np.array(inps.dateList)
 
     # get deformation model from parsers
     model, num_param = read_inps2model(inps)
@@ -410,131 +590,73 @@ def run_timeseries2time_func(inps):
                                            dimension='y',
                                            print_msg=True)
 
-    # loop for block-by-block IO
-    for i, box in enumerate(box_list):
-        box_width  = box[2] - box[0]
-        box_length = box[3] - box[1]
-        num_pixel = box_length * box_width
-        if num_box > 1:
-            print('\n------- processing patch {} out of {} --------------'.format(i+1, num_box))
-            print('box width:  {}'.format(box_width))
-            print('box length: {}'.format(box_length))
-
-        # initiate output
-        m = np.zeros((num_param, num_pixel), dtype=dataType)
-        m_std = np.zeros((num_param, num_pixel), dtype=dataType)
-
-        # read input
-        print('reading data from file {} ...'.format(inps.timeseries_file))
-        ts_data = readfile.read(inps.timeseries_file, box=box)[0]
-        # referencing in time and space
-        # for file w/o reference info. e.g. ERA5.h5
-        if inps.ref_date:
-            print('referecing to date: {}'.format(inps.ref_date))
-            ref_ind = inps.dateList.index(inps.ref_date)
-            ts_data -= np.tile(ts_data[ref_ind, :, :], (ts_data.shape[0], 1, 1))
-        if inps.ref_yx:
-            print('referencing to point (y, x): ({}, {})'.format(inps.ref_yx[0], inps.ref_yx[1]))
-            ref_box = (inps.ref_yx[1], inps.ref_yx[0], inps.ref_yx[1]+1, inps.ref_yx[0]+1)
-            ref_val = readfile.read(inps.timeseries_file, box=ref_box)[0]
-            ts_data -= np.tile(ref_val.reshape(ts_data.shape[0], 1, 1), (1, ts_data.shape[1], ts_data.shape[2]))
-
-        ts_data = ts_data[inps.dropDate, :, :].reshape(inps.numDate, -1)
-        if atr['UNIT'] == 'mm':
-            ts_data *= 1./1000.
-
-        # mask invalid pixels
-        print('skip pixels with zero/nan value in all acquisitions')
-        ts_stack = np.nanmean(ts_data, axis=0)
-        mask = np.multiply(~np.isnan(ts_stack), ts_stack!=0.)
-        del ts_stack
-
-        ts_data = ts_data[:, mask]
-        num_pixel2inv = int(np.sum(mask))
-        print('number of pixels to invert: {} out of {} ({:.1f}%)'.format(
-            num_pixel2inv, num_pixel, num_pixel2inv/num_pixel*100))
-
-        # go to next if no valid pixel found
-        if num_pixel2inv == 0:
-            block = [box[1], box[3], box[0], box[2]]
-            write_hdf5_block(inps.outfile, model, m, m_std,
-                             mask=mask,
-                             block=block)
-            continue
-
-
-        ### estimation / solve Gm = d
-
-        if inps.bootstrap:
-            ## option 1 - least squares with bootstrapping
-            # Bootstrapping is a resampling method which can be used to estimate properties
-            # of an estimator. The method relies on independently sampling the data set with
-            # replacement.
+    # design matrix is the same for all patches, compute it once
+    G = timeseries.get_design_matrix4time_func(inps.dateList, model)
+
+    # prepare the input arguments for *_patch()
+    data_kwargs = {
+        'ts_file'         : inps.timeseries_file,
+        'date_list'       : inps.dateList,
+        'drop_date'       : inps.dropDate,
+        'model'           : model,
+        'G'               : G,
+        'ref_date'        : inps.ref_date,
+        'ref_yx'          : inps.ref_yx,
+        'bootstrap'       : inps.bootstrap,
+        'bootstrap_count' : inps.bootstrapCount,
+    }
 
-            try:
-                from sklearn.utils import resample
-            except ImportError:
-                raise ImportError('can not import scikit-learn!')
-            print('using bootstrap resampling {} times ...'.format(inps.bootstrapCount)) 
+    # loop for block-by-block IO
+    if inps.cluster:
+        # initiate dask cluster and client, once for all boxes
+        cluster_obj = cluster.DaskCluster(inps.cluster, inps.numWorker, config_name=inps.config)
+        cluster_obj.open()
+
+    try:
+        for i, box in enumerate(box_list):
+            box_wid = box[2] - box[0]
+            box_len = box[3] - box[1]
+            if num_box > 1:
+                print('\n------- processing patch {} out of {} --------------'.format(i+1, num_box))
+                print('box width:  {}'.format(box_wid))
+                print('box length: {}'.format(box_len))
+
+            # update box argument in the input data
+            data_kwargs['box'] = box
+
+            # estimate
+            if not inps.cluster:
+                # non-parallel
+                m, m_std, mask = run_timeseries2time_func_patch(**data_kwargs)[:-1]
 
-            # calc model of all bootstrap sampling
-            m_boot = np.zeros((inps.bootstrapCount, num_param, num_pixel2inv), dtype=dataType)
-            prog_bar = ptime.progressBar(maxValue=inps.bootstrapCount)
-            for i in range(inps.bootstrapCount):
-                # bootstrap resampling
-                boot_ind = resample(np.arange(inps.numDate),
-                                    replace=True,
-                                    n_samples=inps.numDate)
-                boot_ind.sort()
+            else:
+                # parallel
+                print('\n\n------- start parallel processing using Dask -------')
 
-                # estimation
-                m_boot[i] = estimate_time_func(dates[boot_ind].tolist(),
-                                               ts_data[boot_ind],
-                                               model)[1]
+                # initiate the output data
+                m = np.zeros((num_param, box_len, box_wid), dtype=dataType)
+                m_std = np.zeros((num_param, box_len, box_wid), dtype=dataType)
+                mask = np.zeros((box_len, box_wid), dtype=np.bool_)
 
-                prog_bar.update(i+1, suffix='iteration {} / {}'.format(i+1, inps.bootstrapCount))
-            prog_bar.close()
-            del ts_data
+                # run dask
+                m, m_std, mask = cluster_obj.run(func=run_timeseries2time_func_patch,
+                                                 func_data=data_kwargs,
+                                                 results=[m, m_std, mask])
 
-            # get mean/std among all bootstrap sampling
-            print('calculate mean and standard deviation of bootstrap estimations')
-            m[:, mask] = m_boot.mean(axis=0).reshape(num_param, -1)
-            m_std[:, mask] = m_boot.std(axis=0).reshape(num_param, -1)
-            del m_boot
+                print('------- finished parallel processing -------\n\n')
 
+            # write
+            block = [box[1], box[3], box[0], box[2]]
+            write_hdf5_block(inps.outfile, model,
+                             m.reshape(num_param, -1),
+                             m_std.reshape(num_param, -1),
+                             mask=mask.flatten(),
+                             block=block)
 
-        else:
-            ## option 2 - least squares with uncertainty propagation
-
-            print('estimate time functions via linalg.lstsq ...')
-            G, m[:, mask], e2 = estimate_time_func(inps.dateList,
-                                                   ts_data,
-                                                   model)
-            del ts_data
-
-            ## Compute the covariance matrix for model parameters: Gm = d
-            # C_m_hat = (G.T * C_d^-1, * G)^-1  # the most generic form
-            #         = sigma^2 * (G.T * G)^-1  # assuming the obs error is normally distributed in time.
-            # Based on the law of integrated expectation, we estimate the obs sigma^2 using
-            # the OLS estimation residual e_hat_i = d_i - d_hat_i
-            # sigma^2 = sigma_hat^2 * N / (N - P)
-            #         = (e_hat.T * e_hat) / (N - P)  # sigma_hat^2 = (e_hat.T * e_hat) / N
-
-            G_inv = linalg.inv(np.dot(G.T, G))
-            m_var = e2.reshape(1, -1) / (num_date - num_param)
-            m_std[:, mask] = np.sqrt(np.dot(np.diag(G_inv).reshape(-1, 1), m_var))
-
-            ## for linear velocity, the STD can also be calculated 
-            # using Eq. (10) from Fattahi and Amelung (2015, JGR)
-            # ts_diff = ts_data - np.dot(G, m)
-            # t_diff = G[:, 1] - np.mean(G[:, 1])
-            # vel_std = np.sqrt(np.sum(ts_diff ** 2, axis=0) / np.sum(t_diff ** 2)  / (num_date - 2))
-
-        # write
-        block = [box[1], box[3], box[0], box[2]]
-        write_hdf5_block(inps.outfile, model, m, m_std,
-                         mask=mask,
-                         block=block)
+    finally:
+        if inps.cluster:
+            # close dask cluster and client, also on errors
+            cluster_obj.close()
 
     return inps.outfile
 
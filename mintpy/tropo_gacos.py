@@ -274,7 +274,9 @@ def calculate_delay_timeseries(tropo_file, dis_file, geom_file, GACOS_dir):
         "date"       : [dates.dtype, (num_date,), dates],
         "timeseries" : [np.float32,  (num_date, length, width), None],
     }
-    writefile.layout_hdf5(tropo_file, ds_name_dict, metadata=atr)
+    # chunks of one date, as written date by date
+    writefile.layout_hdf5(tropo_file, ds_name_dict, metadata=atr,
+                          chunks=(1, 256, 1024))
 
 
     ## calculate phase delay
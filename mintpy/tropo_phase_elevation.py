@@ -162,15 +162,20 @@ def estimate_phase_elevation_ratio(dem, ts_data, inps):
     # calculate correlation coefficient
     print('----------------------------------------------------------')
     print('calculate correlation of DEM with each acquisition')
-    topo_trop_corr = np.zeros(num_date, np.float32)
+    # Pearson correlation for all acquisitions at once, with the DEM terms calculated only once
+    # sum((phase - mean(phase)) * dem_anom) == sum(phase * dem_anom) as sum(dem_anom) == 0
+    num_pixel = dem.size
+    dem_anom = dem - np.mean(dem, dtype=np.float64)
+    dem_var = np.dot(dem_anom, dem_anom)
+    ts_cov = np.einsum('ij,j->i', ts_data, dem_anom, dtype=np.float64)
+    ts_mean = np.mean(ts_data, axis=1, dtype=np.float64)
+    ts_var = np.einsum('ij,ij->i', ts_data, ts_data, dtype=np.float64) - num_pixel * ts_mean**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        topo_trop_corr = np.array(ts_cov / np.sqrt(ts_var * dem_var), dtype=np.float32)
+    # acquisitions with all zero phase, i.e. the reference date
+    topo_trop_corr[np.all(ts_data == 0, axis=1)] = 0.
     for i in range(num_date):
-        phase = ts_data[i, :]
-        cc = 0.
-        if np.count_nonzero(phase) > 0:
-            comp_data = np.vstack((dem, phase))
-            cc = np.corrcoef(comp_data)[0, 1]
-            topo_trop_corr[i] = cc
-        print('{}: {:>5.2f}'.format(inps.date_list[i], cc))
+        print('{}: {:>5.2f}'.format(inps.date_list[i], topo_trop_corr[i]))
     topo_trop_corr = np.abs(topo_trop_corr)
     print('average correlation magnitude: {:>5.2f}'.format(np.nanmean(topo_trop_corr)))
 
@@ -195,7 +200,7 @@ def estimate_tropospheric_delay(dem, X, metadata):
 
     ref_index = int(metadata['REF_Y']) * width + int(metadata['REF_X'])
     ref_value = trop_data[:, ref_index].reshape(-1, 1)
-    trop_data -= np.tile(ref_value, (1, length*width))
+    trop_data -= ref_value
 
     trop_data = np.reshape(trop_data, (num_date, length, width))
     return trop_data
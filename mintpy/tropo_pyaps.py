@@ -16,6 +16,7 @@ except ImportError:
     raise ImportError('Cannot import pyaps!')
 
 import argparse
+import h5py
 import numpy as np
 from mintpy.objects import timeseries, geometry
 from mintpy.utils import readfile, writefile, ptime, utils as ut
@@ -229,6 +230,8 @@ def check_inputs(inps):
             inps.inc_angle = np.ones(dem.shape, dtype=np.float32) * inps.inc_angle
         inps.inc_angle_file = 'pyapsIncAngle.flt'
         writefile.write(inps.inc_angle, inps.inc_angle_file, metadata=atr)
+        # zenith-to-LOS projection factor, shared by all acquisitions
+        inps.cos_inc_angle = np.cos(inps.inc_angle * np.pi / 180.)
 
         # latitude
         if 'latitude' in geom_obj.datasetNames:
@@ -385,6 +388,7 @@ def get_delay(grib_file, inps):
                     delay_type  - string, comb/dry/wet
                     ref_y/x     - string, reference pixel row/col number
                     inc_angle   - np.array, 0/1/2 D
+                    cos_inc_angle - np.array, 0/1/2 D, cos(inc_angle)
     Output:
         phs - 2D np.array, absolute tropospheric phase delay relative to ref_y/x
     """
@@ -407,7 +411,7 @@ def get_delay(grib_file, inps):
                         inc=inps.inc_angle_file)
     else:
         aps.getdelay(phs, inc=0.)
-        phs /= np.cos(inps.inc_angle*np.pi/180.)
+        phs /= inps.cos_inc_angle
 
     # Get relative phase delay in space
     phs -= phs[inps.ref_yx[0], inps.ref_yx[1]]
@@ -439,35 +443,59 @@ def get_delay_timeseries(inps, atr):
         length, width = int(atr['LENGTH']), int(atr['WIDTH'])
         num_date = len(inps.grib_file_list)
         date_list = [str(re.findall('\d{8}', i)[0]) for i in inps.grib_file_list]
-        trop_data = np.zeros((num_date, length, width), np.float32)
+
+        # reference date
+        inps.ref_date = atr.get('REF_DATE', date_list[0])
+        inps.ref_idx = date_list.index(inps.ref_date)
+
+        # prepare output file, written date by date
+        # instead of holding the whole 3D delay matrix in memory
+        meta = dict(atr)
+        meta['FILE_TYPE'] = 'timeseries'
+        meta['REF_Y'] = inps.ref_yx[0]
+        meta['REF_X'] = inps.ref_yx[1]
+        dates = np.array(date_list, dtype=np.string_)
+        ds_name_dict = {
+            "date"       : [dates.dtype, (num_date,), dates],
+            "timeseries" : [np.float32,  (num_date, length, width), None],
+        }
+        compression = None
+        if inps.timeseries_file:
+            ts_obj = timeseries(inps.timeseries_file)
+            ts_obj.open(print_msg=False)
+            if ts_obj.pbase.size == num_date:
+                ds_name_dict['bperp'] = [np.float32, (num_date,), ts_obj.pbase]
+            with h5py.File(inps.timeseries_file, 'r') as f:
+                compression = f['timeseries'].compression
+        # chunks of one date, as written date by date
+        writefile.layout_hdf5(inps.trop_file, ds_name_dict, metadata=meta, compression=compression,
+                              chunks=(1, 256, 1024))
 
         print('calculating delay for each date using PyAPS (Jolivet et al., 2011; 2014) ...')
         print('number of grib files used: {}'.format(num_date))
+        # delay on the reference date first, to convert to relative phase delay on the fly
+        print('convert to relative phase delay with reference date: '+inps.ref_date)
+        ref_data = get_delay(inps.grib_file_list[inps.ref_idx], inps)
+
         prog_bar = ptime.progressBar(maxValue=num_date)
         for i in range(num_date):
             grib_file = inps.grib_file_list[i]
-            trop_data[i] = get_delay(grib_file, inps)
+            if i == inps.ref_idx:
+                trop_data = np.zeros((length, width), np.float32)
+            else:
+                trop_data = get_delay(grib_file, inps)
+                trop_data -= ref_data
+
+            # write tropospheric delay to HDF5
+            block = [i, i+1, 0, length, 0, width]
+            writefile.write_hdf5_block(inps.trop_file,
+                                       data=trop_data,
+                                       datasetName='timeseries',
+                                       block=block,
+                                       print_msg=False)
             prog_bar.update(i+1, suffix=os.path.basename(grib_file))
         prog_bar.close()
 
-        # Convert relative phase delay on reference date
-        try:
-            inps.ref_date = atr['REF_DATE']
-        except:
-            inps.ref_date = date_list[0]
-        print('convert to relative phase delay with reference date: '+inps.ref_date)
-        inps.ref_idx = date_list.index(inps.ref_date)
-        trop_data -= np.tile(trop_data[inps.ref_idx, :, :], (num_date, 1, 1))
-
-        # Write tropospheric delay to HDF5
-        atr['REF_Y'] = inps.ref_yx[0]
-        atr['REF_X'] = inps.ref_yx[1]
-        ts_obj = timeseries(inps.trop_file)
-        ts_obj.write2hdf5(data=trop_data,
-                          dates=date_list,
-                          metadata=atr,
-                          refFile=inps.timeseries_file)
-
     # Delete temporary DEM file in ROI_PAC format
     if inps.geom_file:
         temp_files =[fname for fname in [inps.dem_file,
@@ -9,11 +9,12 @@
 import os
 import sys
 import re
-import subprocess
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import h5py
 import numpy as np
-from mintpy.objects import timeseries, geometry
+from mintpy.objects import timeseries, geometry, cluster
 from mintpy.utils import ptime, readfile, writefile, utils as ut
 
 try:
@@ -130,6 +131,9 @@ def create_parser():
 
     delay.add_argument('--tropo-file', dest='tropo_file', type=str,
                        help='tropospheric delay file name')
+    delay.add_argument('--num-process', dest='numProcess', type=int, default=1,
+                       help='number of processes to calculate the delay of multiple dates in parallel,\n'
+                            'the geometry is passed to each process once (default: %(default)s).')
     delay.add_argument('--verbose', dest='verbose', action='store_true', help='Verbose message.')
     return parser
 
@@ -598,6 +602,19 @@ def get_delay(grib_file, tropo_model, delay_type, dem, inc, lat, lon, mask=None,
     return pha
 
 
+# geometry and settings of the worker processes, passed once via the pool initializer instead of with every date
+_worker_delay_kwargs = None
+
+
+def _init_delay_worker(delay_kwargs):
+    global _worker_delay_kwargs
+    _worker_delay_kwargs = delay_kwargs
+
+
+def _get_delay_worker(grib_file):
+    return get_delay(grib_file, **_worker_delay_kwargs)
+
+
 def calc_delay_timeseries(inps):
     """Calculate delay time-series and write it to HDF5 file.
     Parameters: inps : namespace, all input parameters
@@ -694,7 +711,9 @@ def calc_delay_timeseries(inps):
         "date"       : [dates.dtype, (num_date,), dates],
         "timeseries" : [np.float32,  (num_date, length, width), None],
     }
-    writefile.layout_hdf5(inps.tropo_file, ds_name_dict, metadata=atr)
+    # chunks of one date, as written date by date
+    writefile.layout_hdf5(inps.tropo_file, ds_name_dict, metadata=atr,
+                          chunks=(1, 256, 1024))
 
 
     ## 3. calculate phase delay
@@ -702,21 +721,34 @@ def calc_delay_timeseries(inps):
     print('calculating absolute delay for each date using PyAPS (Jolivet et al., 2011; 2014) ...')
     print('number of grib files used: {}'.format(num_date))
 
-    prog_bar = ptime.progressBar(maxValue=num_date, print_msg=~inps.verbose)
-    for i in range(num_date):
-        grib_file = inps.grib_files[i]
-
-        # calc tropo delay
-        tropo_data = get_delay(grib_file,
-                               tropo_model=inps.tropo_model,
-                               delay_type=inps.delay_type,
-                               dem=inps.dem,
-                               inc=inps.inc,
-                               lat=inps.lat,
-                               lon=inps.lon,
-                               mask=mask,
-                               verbose=inps.verbose)
+    delay_kwargs = dict(tropo_model=inps.tropo_model,
+                        delay_type=inps.delay_type,
+                        dem=inps.dem,
+                        inc=inps.inc,
+                        lat=inps.lat,
+                        lon=inps.lon,
+                        mask=mask,
+                        verbose=inps.verbose)
+
+    # calculate the next few dates in parallel processes while writing the current one
+    num_process = max(min(inps.numProcess, num_date), 1)
+    if num_process > 1:
+        print('calculate delays of {} dates in parallel'.format(num_process))
+        # pass the geometry to each process once, instead of with every date
+        delay_func = _get_delay_worker
+        pool_kwargs = dict(pool_class=ProcessPoolExecutor,
+                           initializer=_init_delay_worker,
+                           initargs=(delay_kwargs,))
+    else:
+        delay_func = functools.partial(get_delay, **delay_kwargs)
+        pool_kwargs = {}
 
+    delay_iter = cluster.prefetch_map(delay_func,
+                                      ((grib_file,) for grib_file in inps.grib_files),
+                                      num_worker=num_process,
+                                      **pool_kwargs)
+    prog_bar = ptime.progressBar(maxValue=num_date, print_msg=~inps.verbose)
+    for i, tropo_data in enumerate(delay_iter):
         # write tropo delay to file
         block = [i, i+1, 0, length, 0, width]
         writefile.write_hdf5_block(inps.tropo_file,
@@ -724,8 +756,7 @@ def calc_delay_timeseries(inps):
                                    datasetName='timeseries',
                                    block=block,
                                    print_msg=False)
-
-        prog_bar.update(i+1, suffix=os.path.basename(grib_file))
+        prog_bar.update(i+1, suffix=os.path.basename(inps.grib_files[i]))
     prog_bar.close()
 
     return inps.tropo_file
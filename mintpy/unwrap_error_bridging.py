@@ -10,9 +10,11 @@ import os
 import sys
 import time
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import h5py
 import numpy as np
-from mintpy.objects import ifgramStack
+from mintpy.objects import ifgramStack, cluster
 from mintpy.objects.conncomp import connectComponent
 from mintpy.defaults.template import get_template_content
 from mintpy.utils import (ptime,
@@ -72,6 +74,8 @@ def create_parser():
                         help='name of dataset to be written after correction, default: {}_bridging')
     parser.add_argument('--update', dest='update_mode', action='store_true',
                         help='Enable update mode: if unwrapPhase_unwCor dataset exists, skip the correction.')
+    parser.add_argument('--num-process', dest='numProcess', type=int, default=1,
+                        help='number of processes to correct interferograms in parallel (default: %(default)s).')
     return parser
 
 
@@ -169,9 +173,44 @@ def run_or_skip(inps):
 
 
 ##########################################################################################
+def bridge_unwrap_error(unw, cc, metadata, water_mask=None, radius=50, ramp_type=None):
+    """Correct unwrapping error of one interferogram with bridging
+    Parameters: unw        : 2D np.ndarray in float32, unwrapped phase
+                cc         : 2D np.ndarray, connected components
+                metadata   : dict, attributes of the interferogram
+                water_mask : 2D np.ndarray in bool, water mask
+    Returns:    unw_cor    : 2D np.ndarray in float32, corrected unwrapped phase
+    """
+    if water_mask is not None:
+        cc[water_mask == 0] = 0
+
+    cc_obj = connectComponent(conncomp=cc, metadata=metadata)
+    cc_obj.label()
+    cc_obj.find_mst_bridge()
+    unw_cor = cc_obj.unwrap_conn_comp(unw, radius=radius, ramp_type=ramp_type)
+    return unw_cor
+
+
+# water mask of the worker processes, passed once via the pool initializer instead of with every task
+_worker_water_mask = None
+
+
+def _init_bridge_worker(water_mask):
+    global _worker_water_mask
+    _worker_water_mask = water_mask
+
+
+def _bridge_unwrap_error_worker(unw, cc, **kwargs):
+    # dropped interferograms, i.e. cc is None, are returned as they are
+    if cc is None:
+        return unw
+    kwargs.setdefault('water_mask', _worker_water_mask)
+    return bridge_unwrap_error(unw, cc, **kwargs)
+
+
 def run_unwrap_error_bridge(ifgram_file, water_mask_file, ramp_type=None, radius=50, 
                             ccName='connectComponent', dsNameIn='unwrapPhase',
-                            dsNameOut='unwrapPhase_bridging'):
+                            dsNameOut='unwrapPhase_bridging', num_process=1):
     """Run unwrapping error correction with bridging
     Parameters: ifgram_file     : str, path of ifgram stack file
                 water_mask_file : str, path of water mask file
@@ -179,6 +218,8 @@ def run_unwrap_error_bridge(ifgram_file, water_mask_file, ramp_type=None, radius
                 ccName          : str, dataset name of connected components
                 dsNameIn        : str, dataset name of unwrap phase to be corrected
                 dsNameOut       : str, dataset name of unwrap phase to be saved after correction
+                num_process     : int, number of processes to correct interferograms in parallel,
+                                  while reading / writing is done in the main process
     Returns:    ifgram_file     : str, path of ifgram stack file
     """
     print('-'*50)
@@ -200,8 +241,9 @@ def run_unwrap_error_bridge(ifgram_file, water_mask_file, ramp_type=None, radius
 
     # correct unwrap error ifgram by ifgram
     if k == 'ifgramStack':
-        date12_list = ifgramStack(ifgram_file).get_date12_list(dropIfgram=False)
-        date12_list_kept = ifgramStack(ifgram_file).get_date12_list(dropIfgram=True)
+        stack_obj = ifgramStack(ifgram_file)
+        date12_list = stack_obj.get_date12_list(dropIfgram=False)
+        date12_list_kept = stack_obj.get_date12_list(dropIfgram=True)
         num_ifgram = len(date12_list)
         shape_out = (num_ifgram, length, width)
 
@@ -222,30 +264,35 @@ def run_unwrap_error_bridge(ifgram_file, water_mask_file, ramp_type=None, radius
                 print('create /{d} of np.float32 in size of {s}'.format(d=dsNameOut, s=shape_out))
 
             # correct unwrap error ifgram by ifgram
+            # with up to num_process interferograms being bridged at the same time
+            num_process = max(min(num_process, num_ifgram), 1)
+            date12_kept = set(date12_list_kept)
+            bridge_kwargs = dict(metadata=atr, radius=radius, ramp_type=ramp_type)
+            pool_kwargs = {}
+            if num_process > 1:
+                # pass the water mask to each process once, instead of with every interferogram
+                pool_kwargs = dict(pool_class=ProcessPoolExecutor,
+                                   initializer=_init_bridge_worker,
+                                   initargs=(water_mask,))
+            else:
+                bridge_kwargs['water_mask'] = water_mask
+
+            def read_data():
+                for i in range(num_ifgram):
+                    unw = np.squeeze(f[dsNameIn][i, :, :])
+                    # skip dropped interferograms
+                    cc = np.squeeze(f[ccName][i, :, :]) if date12_list[i] in date12_kept else None
+                    yield unw, cc
+
+            unw_iter = cluster.prefetch_map(functools.partial(_bridge_unwrap_error_worker, **bridge_kwargs),
+                                            read_data(),
+                                            num_worker=num_process,
+                                            **pool_kwargs)
             prog_bar = ptime.progressBar(maxValue=num_ifgram)
-            for i in range(num_ifgram):
-                # read unwrapPhase
-                date12 = date12_list[i]
-                unw = np.squeeze(f[dsNameIn][i, :, :])
-
-                # skip dropped interferograms
-                if date12 not in date12_list_kept:
-                    ds[i, :, :] = unw
-                else:
-                    # read connectComponent
-                    cc = np.squeeze(f[ccName][i, :, :])
-                    if water_mask is not None:
-                        cc[water_mask == 0] = 0
-
-                    # bridging
-                    cc_obj = connectComponent(conncomp=cc, metadata=atr)
-                    cc_obj.label()
-                    cc_obj.find_mst_bridge()
-                    unw_cor = cc_obj.unwrap_conn_comp(unw, radius=radius, ramp_type=ramp_type)
-
-                    # write to hdf5 file
-                    ds[i, :, :] = unw_cor
-                prog_bar.update(i+1, suffix=date12)
+            for i, unw_cor in enumerate(unw_iter):
+                # write to hdf5 file
+                ds[i, :, :] = unw_cor
+                prog_bar.update(i+1, suffix=date12_list[i])
             prog_bar.close()
             ds.attrs['MODIFICATION_TIME'] = str(time.time())
         print('close {} file.'.format(ifgram_file))
@@ -294,7 +341,8 @@ def main(iargs=None):
                             ramp_type=inps.ramp,
                             radius=inps.bridgePtsRadius,
                             dsNameIn=inps.datasetNameIn,
-                            dsNameOut=inps.datasetNameOut)
+                            dsNameOut=inps.datasetNameOut,
+                            num_process=inps.numProcess)
 
     # config parameter
     if os.path.splitext(inps.ifgram_file)[1] in ['.h5', '.he5']:
@@ -14,19 +14,14 @@ import h5py
 import numpy as np
 from matplotlib import pyplot as plt, ticker
 
-try:
-    from cvxopt import matrix
-except ImportError:
-    raise ImportError('Cannot import cvxopt')
 try:
     from skimage import measure
 except ImportError:
     raise ImportError('Could not import skimage!')
 
-from mintpy.objects import ifgramStack, conncomp
+from mintpy.objects import ifgramStack, conncomp, cluster
 from mintpy.defaults.template import get_template_content
-from mintpy.utils import ptime, readfile, writefile, utils as ut, plot as pp
-from mintpy.utils.solvers import l1regls
+from mintpy.utils import ptime, readfile, writefile, utils as ut, plot as pp, arg_group
 from mintpy import ifgram_inversion as ifginv
 
 
@@ -41,6 +36,7 @@ EXAMPLE = """example:
   # calculate the number of non-zero closure phase
   unwrap_error_phase_closure.py  ./inputs/ifgramStack.h5  --action calculate
   unwrap_error_phase_closure.py  ./inputs/ifgramStack.h5  --action calculate  --water-mask waterMask.h5
+  unwrap_error_phase_closure.py  ./inputs/ifgramStack.h5  --action calculate  -c local --num-worker 4
 """
 
 NOTE = """
@@ -95,6 +91,9 @@ def create_parser():
     mask.add_argument('-t', '--template', dest='template_file',
                       help='template file with options for setting.')
 
+    # computing
+    parser = arg_group.add_parallel_argument(parser)
+
     parser.add_argument('--update', dest='update_mode', action='store_true',
                         help='Enable update mode: if unwrapPhase_phaseClosure dataset exists, skip the correction.')
     return parser
@@ -126,6 +125,12 @@ def cmd_line_parse(iargs=None):
     if inps.waterMaskFile and not os.path.isfile(inps.waterMaskFile):
         inps.waterMaskFile = None
 
+    # --cluster and --num-worker option
+    inps.numWorker = str(cluster.DaskCluster.format_num_worker(inps.cluster, inps.numWorker))
+    if inps.cluster and inps.numWorker == '1':
+        print('WARNING: number of workers is 1, turn OFF parallel processing and continue')
+        inps.cluster = None
+
     return inps
 
 
@@ -147,6 +152,17 @@ def read_template2inps(template_file, inps=None):
             elif key in ['numSample']:
                 inpsDict[key] = int(value)
 
+    # computing configurations
+    dask_key_prefix = 'mintpy.compute.'
+    key_list = [i for i in list(inpsDict.keys()) if dask_key_prefix+i in template.keys()]
+    for key in key_list:
+        value = template[dask_key_prefix+key]
+        if key in ['cluster', 'config']:
+            inpsDict[key] = value
+        elif value:
+            if key in ['numWorker']:
+                inpsDict[key] = str(value)
+
     return inps
 
 
@@ -177,7 +193,8 @@ def run_or_skip(inps):
 
 ##########################################################################################
 def calc_num_triplet_with_nonzero_integer_ambiguity(ifgram_file, mask_file=None, dsName='unwrapPhase',
-                                                    out_file=None, max_memory=4, update_mode=True):
+                                                    out_file=None, max_memory=4, update_mode=True,
+                                                    cluster_type=None, num_worker=1, config_name=None):
     """Calculate the number of triplets with non-zero integer ambiguity of closure phase.
 
     T_int as shown in equation (8-9) and inline in Yunjun et al. (2019, CAGEO).
@@ -187,6 +204,7 @@ def calc_num_triplet_with_nonzero_integer_ambiguity(ifgram_file, mask_file=None,
                 dsName      - str, unwrapped phase dataset name used to calculate the closure phase
                 out_file    - str, custom output filename
                 update_mode - bool
+                cluster_type / num_worker / config_name - dask options for parallel processing
     Returns:    out_file    - str, custom output filename
     Example:    calc_num_triplet_with_nonzero_integer_ambiguity('inputs/ifgramStack.h5', mask_file='waterMask.h5')
     """
@@ -257,30 +275,59 @@ def calc_num_triplet_with_nonzero_integer_ambiguity(ifgram_file, mask_file=None,
     msg += '\n    block by block with size up to {}, {} blocks in total'.format((step, width), num_loop)
     print(msg)
 
+    # index of the interferograms with 1 (two) and -1 (one) in each triplet, computed once here,
+    # to calculate the closure phase by indexing instead of the matrix multiplication
+    # with the sparse C, which has only 3 non-zero values per row
+    tri_idx = np.hstack((np.nonzero(C == 1)[1].reshape(-1, 2),
+                         np.nonzero(C == -1)[1].reshape(-1, 1))).astype(np.intp)
+
+    # read only the interferograms involved in any triplet, with tri_idx re-mapped accordingly
+    ifgram_idx, tri_idx = np.unique(tri_idx, return_inverse=True)
+    tri_idx = tri_idx.reshape(-1, 3).astype(np.intp)
+    date12_list2read = [date12_list[i] for i in ifgram_idx]
+    print('number of interferograms involved in triplets: {} out of {}'.format(ifgram_idx.size, num_ifgram))
+
     ref_phase = stack_obj.get_reference_phase(unwDatasetName=dsName, dropIfgram=True).reshape(num_ifgram, -1)
+    data_kwargs = {
+        "ifgram_file" : ifgram_file,
+        "ref_phase"   : ref_phase[ifgram_idx],
+        "tri_idx"     : tri_idx,
+        "dsName"      : dsName,
+        "date12_list" : date12_list2read,
+    }
+
+    if cluster_type:
+        # initiate dask cluster and client
+        print('\n\n------- start parallel processing using Dask -------')
+        cluster_obj = cluster.DaskCluster(cluster_type, num_worker, config_name=config_name)
+        cluster_obj.open()
+
     prog_bar = ptime.progressBar(maxValue=num_loop)
     for i in range(num_loop):
         # box
         r0 = i * step
         r1 = min((r0+step), stack_obj.length)
         box = (0, r0, stack_obj.width, r1)
+        data_kwargs['box'] = box
 
-        # read data
-        unw = ifginv.read_unwrap_phase(stack_obj,
-                                       box=box,
-                                       ref_phase=ref_phase,
-                                       obs_ds_name=dsName,
-                                       dropIfgram=True,
-                                       print_msg=False).reshape(num_ifgram, -1)
+        if not cluster_type:
+            # non-parallel
+            num_nonzero_closure[r0:r1, :] = calc_num_nonzero_closure_patch(**data_kwargs)[0]
 
-        # calculate based on equation (8-9) and T_int equation inline.
-        closure_pha = np.dot(C, unw)
-        closure_int = np.round((closure_pha - ut.wrap(closure_pha)) / (2.*np.pi))
-        num_nonzero_closure[r0:r1, :] = np.sum(closure_int != 0, axis=0).reshape(-1, width)
+        else:
+            # parallel
+            num_nonzero_closure[r0:r1, :] = cluster_obj.run(func=calc_num_nonzero_closure_patch,
+                                                            func_data=data_kwargs,
+                                                            results=[num_nonzero_closure[r0:r1, :]])[0]
 
         prog_bar.update(i+1, every=1, suffix='line {} / {}'.format(r0, length))
     prog_bar.close()
 
+    if cluster_type:
+        # close dask cluster and client
+        cluster_obj.close()
+        print('------- finished parallel processing -------\n\n')
+
     # mask
     if mask_file is not None:
         mask = readfile.read(mask_file)[0]
@@ -306,6 +353,56 @@ def calc_num_triplet_with_nonzero_integer_ambiguity(ifgram_file, mask_file=None,
     return out_file
 
 
+def calc_num_nonzero_closure_patch(ifgram_file, box, ref_phase, tri_idx, dsName='unwrapPhase', date12_list=None):
+    """Calculate the number of triplets with non-zero integer ambiguity for one patch / box.
+
+    Parameters: ifgram_file - str, path of interferogram stack file
+                box         - tuple of 4 int, (x0, y0, x1, y1) of the patch
+                ref_phase   - 2D np.array in size of (num_ifgram, 1), reference phase
+                tri_idx     - 2D np.array in size of (num_tri, 3) in np.intp, index of interferograms
+                              with 1, 1 and -1 in the design matrix of each triplet
+                dsName      - str, unwrapped phase dataset name
+                date12_list - list of str, interferograms to read (in the same order as the file),
+                              e.g. the ones involved in triplets only; None for all kept interferograms,
+                              ref_phase and tri_idx should be consistent with it.
+    Returns:    num_nonzero_closure - 2D np.array in size of (box_len, box_wid) in float32
+                box         - tuple of 4 int, for the assembly of dask results
+    """
+    box_wid = box[2] - box[0]
+    box_len = box[3] - box[1]
+
+    # open the stack file within the function, as HDF5 file objects can not be passed to dask workers
+    stack_obj = ifgramStack(ifgram_file)
+    stack_obj.open(print_msg=False)
+    num_ifgram = ref_phase.shape[0]
+    idx_p1, idx_p2, idx_m1 = tri_idx.T
+
+    # read data
+    if date12_list is not None:
+        # read the input interferograms only and reference them as in ifginv.read_unwrap_phase()
+        ds_names = ['{}-{}'.format(dsName, i) for i in date12_list]
+        unw = stack_obj.read(datasetName=ds_names, box=box, print_msg=False).reshape(num_ifgram, -1)
+        unw[np.isnan(unw)] = 0.
+        np.subtract(unw, ref_phase, out=unw, where=(unw != 0.))
+
+    else:
+        unw = ifginv.read_unwrap_phase(stack_obj,
+                                       box=box,
+                                       ref_phase=ref_phase,
+                                       obs_ds_name=dsName,
+                                       dropIfgram=True,
+                                       print_msg=False).reshape(num_ifgram, -1)
+
+    # calculate based on equation (8-9) and T_int equation inline.
+    # non-zero integer ambiguity <=> closure phase out of [-pi, pi), i.e. equivalent to
+    # np.round((closure_pha - ut.wrap(closure_pha)) / (2.*np.pi)) != 0, without the temporaries
+    closure_pha = unw[idx_p1] + unw[idx_p2] - unw[idx_m1]
+    closure_flag = np.logical_or(closure_pha < -np.pi, closure_pha >= np.pi)
+    num_nonzero_closure = np.sum(closure_flag, axis=0).reshape(box_len, box_wid).astype(np.float32)
+
+    return num_nonzero_closure, box
+
+
 def plot_num_triplet_with_nonzero_integer_ambiguity(fname, display=False, font_size=12, fig_size=[9,3]):
     """Plot the histogram for the number of triplets with non-zero integer ambiguity
 
@@ -378,6 +475,14 @@ def get_common_region_int_ambiguity(ifgram_file, cc_mask_file, water_mask_file=N
                     sample_coords : 2D np.ndarray in size of (num_sample, 2) in int64 format
                     int_ambiguity : 1D np.ndarray in size of (num_ifgram,) in int format
     """
+    # cvxopt is required by the L1-norm solver for correction only,
+    # import it here to keep the calculation mode free of it
+    try:
+        from cvxopt import matrix
+    except ImportError:
+        raise ImportError('Cannot import cvxopt')
+    from mintpy.utils.solvers import l1regls
+
     print('-'*50)
     print('calculating the integer ambiguity for the common regions defined in', cc_mask_file)
     # stack info
@@ -385,7 +490,12 @@ def get_common_region_int_ambiguity(ifgram_file, cc_mask_file, water_mask_file=N
     stack_obj.open()
     date12_list = stack_obj.get_date12_list(dropIfgram=True)
     num_ifgram = len(date12_list)
-    C = matrix(ifgramStack.get_design_matrix4triplet(date12_list).astype(float))
+    C = ifgramStack.get_design_matrix4triplet(date12_list).astype(float)
+    C_mat = matrix(C)
+    # index of the interferograms with 1 (two) and -1 (one) in each triplet,
+    # to calculate the closure phase by indexing instead of the matrix multiplication
+    tri_idx = np.hstack((np.nonzero(C == 1)[1].reshape(-1, 2),
+                         np.nonzero(C == -1)[1].reshape(-1, 1))).astype(np.intp)
     ref_phase = stack_obj.get_reference_phase(unwDatasetName=dsNameIn, dropIfgram=True).reshape(num_ifgram, -1)
 
     # prepare common label
@@ -405,39 +515,45 @@ def get_common_region_int_ambiguity(ifgram_file, cc_mask_file, water_mask_file=N
     print('solving the phase-unwrapping integer ambiguity for {}'.format(dsNameIn))
     print('\tbased on the closure phase of interferograms triplets (Yunjun et al., 2019)')
     print('\tusing the L1-norm regularzed least squares approximation (LASSO) ...')
-    for i in range(num_label):
-        common_reg = common_regions[i]
-        # sample_coords
-        idx = sorted(np.random.choice(common_reg.area, num_sample, replace=False))
-        common_reg.sample_coords = common_reg.coords[idx, :].astype(int)
-
-        # solve for int_ambiguity
-        U = np.zeros((num_ifgram, num_sample))
-        if common_reg.label == label_img[stack_obj.refY, stack_obj.refX]:
-            print('{}/{} skip calculation for the reference region'.format(i+1, num_label))
-        else:
-            prog_bar = ptime.progressBar(maxValue=num_sample, prefix='{}/{}'.format(i+1, num_label))
-            for j in range(num_sample):
-                # read unwrap phase
-                y, x = common_reg.sample_coords[j, :]
-                unw = ifginv.read_unwrap_phase(stack_obj,
-                                               box=(x, y, x+1, y+1),
-                                               ref_phase=ref_phase,
-                                               obs_ds_name=dsNameIn,
-                                               dropIfgram=True,
-                                               print_msg=False).reshape(num_ifgram, -1)
+    # open the file once for all regions, with a chunk cache large enough to hold
+    # the chunks shared by the sample pixels, so that they are read from disk only once
+    with h5py.File(ifgram_file, 'r', rdcc_nbytes=256*1024**2, rdcc_nslots=10007) as f:
+        ds = f[dsNameIn]
+        flag = f['dropIfgram'][:]
+        for i in range(num_label):
+            common_reg = common_regions[i]
+            # sample_coords
+            idx = sorted(np.random.choice(common_reg.area, num_sample, replace=False))
+            common_reg.sample_coords = common_reg.coords[idx, :].astype(int)
+
+            # solve for int_ambiguity
+            U = np.zeros((num_ifgram, num_sample))
+            if common_reg.label == label_img[stack_obj.refY, stack_obj.refX]:
+                print('{}/{} skip calculation for the reference region'.format(i+1, num_label))
+            else:
+                # read unwrap phase of all samples
+                unw = np.zeros((num_ifgram, num_sample), dtype=np.float32)
+                for j, (y, x) in enumerate(common_reg.sample_coords):
+                    unw[:, j] = ds[:, y, x][flag]
+                unw[np.isnan(unw)] = 0.
+                np.subtract(unw, ref_phase, out=unw, where=(unw != 0.))
 
                 # calculate closure_int
-                closure_pha = np.dot(C, unw)
-                closure_int = matrix(np.round((closure_pha - ut.wrap(closure_pha)) / (2.*np.pi)))
+                closure_pha = unw[tri_idx[:, 0]] + unw[tri_idx[:, 1]] - unw[tri_idx[:, 2]]
+                # integer ambiguity, i.e. np.round((closure_pha - ut.wrap(closure_pha)) / (2.*np.pi)),
+                # via the direct floor division without the wrapped temporary array
+                closure_int = np.floor((closure_pha + np.pi) / (2.*np.pi))
 
                 # solve for U
-                U[:,j] = np.round(l1regls(-C, closure_int, alpha=1e-2, show_progress=0)).flatten()
-                prog_bar.update(j+1, every=5)
-            prog_bar.close()
-        # add int_ambiguity
-        common_reg.int_ambiguity = np.median(U, axis=1)
-        common_reg.date12_list = date12_list
+                prog_bar = ptime.progressBar(maxValue=num_sample, prefix='{}/{}'.format(i+1, num_label))
+                for j in range(num_sample):
+                    U[:,j] = np.round(l1regls(-C_mat, matrix(closure_int[:, j].tolist()),
+                                              alpha=1e-2, show_progress=0)).flatten()
+                    prog_bar.update(j+1, every=5)
+                prog_bar.close()
+            # add int_ambiguity
+            common_reg.int_ambiguity = np.median(U, axis=1)
+            common_reg.date12_list = date12_list
 
     #sort regions by size to facilitate the region matching later
     common_regions.sort(key=lambda x: x.area, reverse=True)
@@ -510,20 +626,25 @@ def run_unwrap_error_phase_closure(ifgram_file, common_regions, water_mask_file=
                     cc[water_mask == 0] = 0
                 cc_obj = conncomp.connectComponent(conncomp=cc, metadata=stack_obj.metadata)
                 cc_obj.label()
-                local_regions = measure.regionprops(cc_obj.labelImg)
+                label_img = cc_obj.labelImg
 
-                # matching regions and correct unwrap error
+                # matching regions: a local region takes the integer ambiguity of
+                # the first common region with all its samples inside
                 idx_common = common_regions[0].date12_list.index(date12)
-                for local_reg in local_regions:
-                    local_mask = cc_obj.labelImg == local_reg.label
-                    U = 0
-                    for common_reg in common_regions:
-                        y = common_reg.sample_coords[:,0]
-                        x = common_reg.sample_coords[:,1]
-                        if all(local_mask[y, x]):
-                            U = common_reg.int_ambiguity[idx_common]
-                            break
-                    unw_cor[local_mask] += 2. * np.pi * U
+                U = np.zeros(label_img.max() + 1, dtype=np.float64)
+                flag = np.zeros(U.size, dtype=np.bool_)
+                for common_reg in common_regions:
+                    y = common_reg.sample_coords[:,0]
+                    x = common_reg.sample_coords[:,1]
+                    labels = label_img[y, x]
+                    label = labels[0]
+                    if label != 0 and not flag[label] and np.all(labels == label):
+                        U[label] = common_reg.int_ambiguity[idx_common]
+                        flag[label] = True
+
+                # correct unwrap error for all local regions in one pass
+                # via label look-up, instead of one full-size mask per region
+                unw_cor += 2. * np.pi * U[label_img]
 
             # write to hdf5 file
             ds[i, :, :] = unw_cor
@@ -563,7 +684,10 @@ def main(iargs=None):
         out_file = calc_num_triplet_with_nonzero_integer_ambiguity(inps.ifgram_file,
                                                                    mask_file=inps.waterMaskFile,
                                                                    dsName=inps.datasetNameIn,
-                                                                   update_mode=inps.update_mode)
+                                                                   update_mode=inps.update_mode,
+                                                                   cluster_type=inps.cluster,
+                                                                   num_worker=inps.numWorker,
+                                                                   config_name=inps.config)
         # for debug
         #plot_num_triplet_with_nonzero_integer_ambiguity(out_file)
     m, s = divmod(time.time()-start_time, 60)
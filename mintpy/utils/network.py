@@ -13,7 +13,7 @@ import itertools
 import h5py
 import numpy as np
 from scipy import sparse
-from matplotlib import dates as mdates, pyplot as plt
+from matplotlib import pyplot as plt
 from matplotlib.tri import Triangulation
 from mintpy.objects import ifgramStack, sensor
 from mintpy.utils import ptime, readfile
@@ -488,21 +488,21 @@ def coherence_matrix(date12_list, coh_list, diag_value=np.nan, fill_triangle='bo
     date_list = ptime.yymmdd(date_list)
     date_num = len(date_list)
 
+    # date index of all pairs, via dict lookup instead of list.index()
+    date_idx = {d: i for i, d in enumerate(date_list)}
+    idx1 = np.array([date_idx[i.split('-')[0]] for i in date12_list], dtype=np.intp)
+    idx2 = np.array([date_idx[i.split('-')[1]] for i in date12_list], dtype=np.intp)
+    coh = np.array(coh_list, dtype=np.float64)
+
     coh_mat = np.zeros([date_num, date_num])
     coh_mat[:] = np.nan
-    for date12 in date12_list:
-        date1, date2 = date12.split('-')
-        idx1 = date_list.index(date1)
-        idx2 = date_list.index(date2)
-        coh = coh_list[date12_list.index(date12)]
-        if fill_triangle in ['upper', 'both']:
-            coh_mat[idx1, idx2] = coh  # symmetric
-        if fill_triangle in ['lower', 'both']:
-            coh_mat[idx2, idx1] = coh
+    if fill_triangle in ['upper', 'both']:
+        coh_mat[idx1, idx2] = coh  # symmetric
+    if fill_triangle in ['lower', 'both']:
+        coh_mat[idx2, idx1] = coh
 
     if diag_value is not np.nan:
-        for i in range(date_num):    # diagonal value
-            coh_mat[i, i] = diag_value
+        np.fill_diagonal(coh_mat, diag_value)
     return coh_mat
 
 
@@ -547,23 +547,23 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
 
     ## maxBperp and maxBtemp
     date12List = ptime.yyyymmdd_date12(date12List)
-    ifgram_num = len(date12List)
-    pbase12 = np.zeros(ifgram_num)
-    tbase12 = np.zeros(ifgram_num)
-    for i in range(ifgram_num):
-        m_date, s_date = date12List[i].split('_')
-        m_idx = dateList.index(m_date)
-        s_idx = dateList.index(s_date)
-        pbase12[i] = pbaseList[s_idx] - pbaseList[m_idx]
-        tbase12[i] = tbaseList[s_idx] - tbaseList[m_idx]
+    # date / date12 index via dict lookup instead of list.index()
+    date_idx = {d: i for i, d in enumerate(dateList)}
+    date12_idx = {d: i for i, d in enumerate(date12List)}
+    m_idx = np.array([date_idx[i.split('_')[0]] for i in date12List], dtype=np.intp)
+    s_idx = np.array([date_idx[i.split('_')[1]] for i in date12List], dtype=np.intp)
+    pbase = np.array(pbaseList, dtype=np.float64)
+    tbase = np.array(tbaseList, dtype=np.float64)
+    pbase12 = pbase[s_idx] - pbase[m_idx]
+    tbase12 = tbase[s_idx] - tbase[m_idx]
     if print_msg:
         print('max perpendicular baseline: {:.2f} m'.format(np.max(np.abs(pbase12))))
         print('max temporal      baseline: {} days'.format(np.max(tbase12)))
 
     ## Keep/Drop - date12
     date12List_keep = sorted(list(set(date12List) - set(date12List_drop)))
-    idx_date12_keep = [date12List.index(i) for i in date12List_keep]
-    idx_date12_drop = [date12List.index(i) for i in date12List_drop]
+    idx_date12_keep = [date12_idx[i] for i in date12List_keep]
+    idx_date12_drop = [date12_idx[i] for i in date12List_drop]
     if not date12List_drop:
         p_dict['disp_drop'] = False
 
@@ -572,8 +572,8 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
     s_dates = [i.split('_')[1] for i in date12List_keep]
     dateList_keep = ptime.yyyymmdd(sorted(list(set(m_dates + s_dates))))
     dateList_drop = sorted(list(set(dateList) - set(dateList_keep)))
-    idx_date_keep = [dateList.index(i) for i in dateList_keep]
-    idx_date_drop = [dateList.index(i) for i in dateList_drop]
+    idx_date_keep = [date_idx[i] for i in dateList_keep]
+    idx_date_drop = [date_idx[i] for i in dateList_drop]
 
     # Ploting
     if cohList is not None:
@@ -594,7 +594,7 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
             cbar.set_label(p_dict['cbar_label'], fontsize=p_dict['fontsize'])
 
         # plot low coherent ifgram first and high coherence ifgram later
-        cohList_keep = [cohList[date12List.index(i)] for i in date12List_keep]
+        cohList_keep = [cohList[date12_idx[i]] for i in date12List_keep]
         date12List_keep = [x for _, x in sorted(zip(cohList_keep, date12List_keep))]
 
     # Dot - SAR Acquisition
@@ -612,12 +612,12 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
     if p_dict['disp_drop']:
         for date12 in date12List_drop:
             date1, date2 = date12.split('_')
-            idx1 = dateList.index(date1)
-            idx2 = dateList.index(date2)
+            idx1 = date_idx[date1]
+            idx2 = date_idx[date2]
             x = np.array([dates[idx1], dates[idx2]])
             y = np.array([pbaseList[idx1], pbaseList[idx2]])
             if cohList is not None:
-                coh = cohList[date12List.index(date12)]
+                coh = cohList[date12_idx[date12]]
                 coh_norm = (coh - disp_min) / (disp_max - disp_min)
                 ax.plot(x, y, '--', lw=p_dict['linewidth'], alpha=transparency, c=cmap(coh_norm))
             else:
@@ -626,12 +626,12 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
     # interferograms kept
     for date12 in date12List_keep:
         date1, date2 = date12.split('_')
-        idx1 = dateList.index(date1)
-        idx2 = dateList.index(date2)
+        idx1 = date_idx[date1]
+        idx2 = date_idx[date2]
         x = np.array([dates[idx1], dates[idx2]])
         y = np.array([pbaseList[idx1], pbaseList[idx2]])
         if cohList is not None:
-            coh = cohList[date12List.index(date12)]
+            coh = cohList[date12_idx[date12]]
             coh_norm = (coh - disp_min) / (disp_max - disp_min)
             ax.plot(x, y, '-', lw=p_dict['linewidth'], alpha=transparency, c=cmap(coh_norm))
         else:
@@ -749,8 +749,9 @@ def plot_rotate_diag_coherence_matrix(ax, coh_list, date12_list, date12_list_dro
         m_dates = [i.split('_')[0] for i in date12_list]
         s_dates = [i.split('_')[1] for i in date12_list]
         date_list = sorted(list(set(m_dates + s_dates)))
+        date_idx = {d: i for i, d in enumerate(date_list)}
         for date12 in date12_list_drop:
-            idx1, idx2 = [date_list.index(i) for i in date12.split('_')]
+            idx1, idx2 = [date_idx[i] for i in date12.split('_')]
             coh_mat[idx2, idx1] = np.nan
 
     #aux info
@@ -759,8 +760,8 @@ def plot_rotate_diag_coherence_matrix(ax, coh_list, date12_list, date12_list_dro
     num_conn = np.max(np.abs(idx1 - idx2))
 
     #plot diagonal - black
-    diag_mat = np.diag(np.ones(num_img))
-    diag_mat[diag_mat == 0.] = np.nan
+    diag_mat = np.full((num_img, num_img), np.nan, dtype=np.float32)
+    np.fill_diagonal(diag_mat, 1.)
     im = ax.imshow(diag_mat, cmap='gray_r', vmin=0.0, vmax=1.0)
     im.set_transform(transforms.Affine2D().rotate_deg(rotate_deg) + ax.transData)
 
@@ -824,14 +825,15 @@ def plot_coherence_matrix(ax, date12List, cohList, date12List_drop=[], p_dict={}
         m_dates = [i.split('_')[0] for i in date12List]
         s_dates = [i.split('_')[1] for i in date12List]
         dateList = sorted(list(set(m_dates + s_dates)))
+        date_idx = {d: i for i, d in enumerate(dateList)}
         # Set dropped pairs' value to nan, in upper triangle only.
         for date12 in date12List_drop:
-            idx1, idx2 = [dateList.index(i) for i in date12.split('_')]
+            idx1, idx2 = [date_idx[i] for i in date12.split('_')]
             coh_mat[idx1, idx2] = np.nan
 
     # Show diagonal value as black, to be distinguished from un-selected interferograms
-    diag_mat = np.diag(np.ones(coh_mat.shape[0]))
-    diag_mat[diag_mat == 0.] = np.nan
+    diag_mat = np.full(coh_mat.shape, np.nan, dtype=np.float32)
+    np.fill_diagonal(diag_mat, 1.)
     im = ax.imshow(diag_mat, cmap='gray_r', vmin=0.0, vmax=1.0, interpolation='nearest')
     im = ax.imshow(coh_mat, cmap=cmap,
                    vmin=p_dict['vlim'][0],
@@ -7,9 +7,7 @@
 #   from mintpy.utils import ptime
 
 import os
-import sys
 import re
-import time
 from datetime import datetime as dt, timedelta
 import numpy as np
 from mintpy.objects.progress import progressBar
@@ -280,6 +278,25 @@ def read_date_list(date_list_in, date_list_all=None):
 
 
 ################################################################
+def date_list2datetime64(date_list):
+    """Convert date strings into np.datetime64 objects, via the ISO 8601 format,
+    which is much faster than calling datetime.strptime() on each date.
+    Parameters: date_list - list of string, date in (YY)YYMMDD(THHMM(SS)) format
+    Returns:    dates     - 1D np.ndarray in datetime64[s]
+    """
+    iso_list = []
+    for date_str in yyyymmdd(list(date_list)):
+        iso_str = '{}-{}-{}'.format(date_str[:4], date_str[4:6], date_str[6:8])
+        # time info: THHMM or THHMMSS
+        if len(date_str) > 8:
+            time_str = date_str[9:]
+            iso_str += 'T{}:{}'.format(time_str[:2], time_str[2:4])
+            if len(time_str) > 4:
+                iso_str += ':{}'.format(time_str[4:6])
+        iso_list.append(iso_str)
+    return np.array(iso_list, dtype='datetime64[s]')
+
+
 def date_list2tbase(date_list):
     """Get temporal Baseline in days with respect to the 1st date
     Parameters: date_list - list of string, date in YYYYMMDD or YYMMDD format
@@ -287,22 +304,15 @@ def date_list2tbase(date_list):
                 dateDict  - dict with key   - string, date in YYYYMMDD format
                                       value - int, temporal baseline in days
     """
-    # date str to dt object
+    # date str to datetime64 object
     date_list = yyyymmdd(date_list)
-    date_format = get_date_str_format(str(date_list))
-    dates = [dt.strptime(i, date_format) for i in date_list]
+    dates = date_list2datetime64(date_list)
 
-    # dt object to time difference in days
-    tbase = []
-    for date in dates:
-        date_delta = date - dates[0]
-        tbase_i = date_delta.days + date_delta.seconds / (24 * 60 * 60)
-        tbase.append(tbase_i)
+    # time difference in days
+    tbase = ((dates - dates[0]) / np.timedelta64(1, 'D')).tolist()
 
     # Dictionary: key - date, value - temporal baseline
-    dateDict = {}
-    for i in range(len(date_list)):
-        dateDict[date_list[i]] = tbase[i]
+    dateDict = dict(zip(date_list, tbase))
     return tbase, dateDict
 
 
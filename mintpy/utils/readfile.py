@@ -258,12 +258,10 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1):
     """
     # File Info: list of slice / dataset / dataset2d / dataset3d
     slice_list = get_slice_list(fname)
-    ds_list = []
-    for i in [i.split('-')[0] for i in slice_list]:
-        if i not in ds_list:
-            ds_list.append(i)
-    ds_2d_list = [i for i in slice_list if '-' not in i]
-    ds_3d_list = [i for i in ds_list if i not in ds_2d_list]
+    # unique dataset names in the original order, via dict instead of list membership test
+    ds_list = list(dict.fromkeys(i.split('-')[0] for i in slice_list))
+    ds_2d_set = set(i for i in slice_list if '-' not in i)
+    ds_3d_list = [i for i in ds_list if i not in ds_2d_set]
 
     # Input Argument: convert input datasetName into list of slice
     if not datasetName:
@@ -317,8 +315,11 @@ def read_hdf5_file(fname, datasetName=None, box=None, xstep=1, ystep=1):
             else:
                 date_list = [i.split('-')[1] for i in
                              [j for j in slice_list if j.startswith(dsFamily)]]
-                for d in inputDateList:
-                    slice_flag[date_list.index(d)] = True
+                # date index via dict lookup instead of list.index()
+                date_idx = {}
+                for i, d in enumerate(date_list):
+                    date_idx.setdefault(d, i)
+                slice_flag[[date_idx[d] for d in inputDateList]] = True
 
             # read data
             if xstep * ystep == 1:
@@ -1419,31 +1420,45 @@ def read_binary(fname, shape, box=None, data_type='float32', byte_order='l',
         data_type = '>{}{}'.format(letter, digit)
 
     # read data
+    # only the lines within the box, by starting from the byte offset of the 1st line
     band_interleave = band_interleave.upper()
+    num_byte = np.dtype(data_type).itemsize
     if band_interleave == 'BIL':
         data = np.fromfile(fname,
                            dtype=data_type,
-                           count=box[3]*width*num_band).reshape(-1, width*num_band)
-        data = data[box[1]:box[3],
-                    width*(band-1)+box[0]:width*(band-1)+box[2]]
+                           count=(box[3]-box[1])*width*num_band,
+                           offset=box[1]*width*num_band*num_byte).reshape(-1, width*num_band)
+        data = data[:, width*(band-1)+box[0]:width*(band-1)+box[2]]
 
     elif band_interleave == 'BIP':
         data = np.fromfile(fname,
                            dtype=data_type,
-                           count=box[3]*width*num_band).reshape(-1, width*num_band)
-        data = data[box[1]:box[3],
-                    np.arange(box[0], box[2])*num_band+band-1]
+                           count=(box[3]-box[1])*width*num_band,
+                           offset=box[1]*width*num_band*num_byte).reshape(-1, width*num_band)
+        data = data[:, np.arange(box[0], box[2])*num_band+band-1]
 
     elif band_interleave == 'BSQ':
         data = np.fromfile(fname,
                            dtype=data_type,
-                           count=(box[3]+length*(band-1))*width).reshape(-1, width)
-        data = data[length*(band-1)+box[1]:length*(band-1)+box[3],
-                    box[0]:box[2]]
+                           count=(box[3]-box[1])*width,
+                           offset=(length*(band-1)+box[1])*width*num_byte).reshape(-1, width)
+        data = data[:, box[0]:box[2]]
     else:
         raise ValueError('unrecognized band interleaving:', band_interleave)
 
+    # skipping/multilooking
+    if xstep * ystep > 1:
+        # output size if x/ystep > 1
+        xsize = int((box[2] - box[0]) / xstep)
+        ysize = int((box[3] - box[1]) / ystep)
+
+        # sampling
+        data = data[int(ystep/2)::ystep,
+                    int(xstep/2)::xstep]
+        data = data[:ysize, :xsize]
+
     # adjust output band for complex data
+    # after skipping, to convert the sampled pixels only
     if data_type.replace('>', '').startswith('c'):
         if cpx_band.startswith('real'):
             data = data.real
@@ -1458,17 +1473,6 @@ def read_binary(fname, shape, box=None, data_type='float32', byte_order='l',
         else:
             raise ValueError('unrecognized complex band:', cpx_band)
 
-    # skipping/multilooking
-    if xstep * ystep > 1:
-        # output size if x/ystep > 1
-        xsize = int((box[2] - box[0]) / xstep)
-        ysize = int((box[3] - box[1]) / ystep)
-
-        # sampling
-        data = data[int(ystep/2)::ystep,
-                    int(xstep/2)::xstep]
-        data = data[:ysize, :xsize]
-
     return data
 
 
@@ -1503,7 +1507,19 @@ def read_gdal(fname, box=None, band=1, cpx_band='phase', xstep=1, ystep=1):
                   win_ysize=box[3]-box[1])
     data = bnd.ReadAsArray(**kwargs)
 
+    # skipping/multilooking
+    if xstep * ystep > 1:
+        # output size if x/ystep > 1
+        xsize = int((box[2] - box[0]) / xstep)
+        ysize = int((box[3] - box[1]) / ystep)
+
+        # sampling
+        data = data[int(ystep/2)::ystep,
+                    int(xstep/2)::xstep]
+        data = data[:ysize, :xsize]
+
     # adjust output band for complex data
+    # after skipping, to convert the sampled pixels only
     data_type = GDAL2ISCE_DATATYPE[bnd.DataType]
     if data_type.replace('>', '').startswith('c'):
         if cpx_band.startswith('real'):
@@ -1519,17 +1535,6 @@ def read_gdal(fname, box=None, band=1, cpx_band='phase', xstep=1, ystep=1):
         else:
             raise ValueError('unrecognized complex band:', cpx_band)
 
-    # skipping/multilooking
-    if xstep * ystep > 1:
-        # output size if x/ystep > 1
-        xsize = int((box[2] - box[0]) / xstep)
-        ysize = int((box[3] - box[1]) / ystep)
-
-        # sampling
-        data = data[int(ystep/2)::ystep,
-                    int(xstep/2)::xstep]
-        data = data[:ysize, :xsize]
-
     return data
 
 
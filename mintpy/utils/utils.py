@@ -8,7 +8,6 @@
 
 
 import os
-import glob
 import errno
 import numpy as np
 from scipy.ndimage import map_coordinates
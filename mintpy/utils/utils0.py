@@ -446,8 +446,9 @@ def wrap(data_in, wrap_range=[-1.*np.pi, np.pi]):
     Returns:    data       : np.array, data after wrapping
     """
     w0, w1 = wrap_range
-    data = np.array(data_in)
-    data = w0 + np.mod(data - w0, w1 - w0)
+    # direct modular wrap, with the offset added in place to save temporary arrays
+    data = np.mod(np.subtract(data_in, w0), w1 - w0)
+    data += w0
     return data
 
 
@@ -210,7 +210,8 @@ def write(datasetDict, out_file, metadata=None, ref_file=None, compression=None)
 
 #########################################################################
 
-def layout_hdf5(fname, ds_name_dict=None, metadata=None, ref_file=None, compression=None, print_msg=True):
+def layout_hdf5(fname, ds_name_dict=None, metadata=None, ref_file=None, compression=None, chunks=True,
+                print_msg=True):
     """Create HDF5 file with defined metadata and (empty) dataset structure
 
     Parameters: fname        - str, HDF5 file path
@@ -223,6 +224,9 @@ def layout_hdf5(fname, ds_name_dict=None, metadata=None, ref_file=None, compress
                 metadata     - dict, metadata
                 ref_file     - str, reference file for the data structure
                 compression  - str, HDF5 compression type
+                chunks       - True or tuple of 3 int, chunk shape of the 3D datasets (clipped to the dataset shape),
+                               e.g. (1, 256, 1024) for files written slice by slice;
+                               True to use the one guessed by h5py, which favors reading the time-series of one pixel
     Returns:    fname        - str, HDF5 file path
 
     Example:    layout_hdf5('timeseries_ERA5.h5', ref_file='timeseries.h5')
@@ -318,8 +322,11 @@ def layout_hdf5(fname, ds_name_dict=None, metadata=None, ref_file=None, compress
                 ds_comp = 'lzf'
 
             # changable dataset shape
+            ds_chunks = True
             if len(data_shape) == 3:
                 max_shape = (None, data_shape[1], data_shape[2])
+                if isinstance(chunks, tuple):
+                    ds_chunks = tuple(max(min(i, j), 1) for i, j in zip(chunks, data_shape))
             else:
                 max_shape = data_shape
 
@@ -335,7 +342,7 @@ def layout_hdf5(fname, ds_name_dict=None, metadata=None, ref_file=None, compress
                                   shape=data_shape,
                                   maxshape=max_shape,
                                   dtype=data_type,
-                                  chunks=True,
+                                  chunks=ds_chunks,
                                   compression=ds_comp)
 
             # write auxliary data
@@ -599,12 +606,10 @@ def write_float32(*args):
 
 def write_complex64(data, out_file):
     """Writes roi_pac .int data"""
-    num_pixel = data.size
-    F = np.zeros([2 * num_pixel, 1], np.float32)
-    id1 = list(range(0, 2 * num_pixel, 2))
-    id2 = list(range(1, 2 * num_pixel, 2))
-    F[id1] = np.reshape(np.cos(data), (num_pixel, 1))
-    F[id2] = np.reshape(np.sin(data), (num_pixel, 1))
+    # complex64 in C-order == interleaved float32 real / imag, dumped in one contiguous write
+    F = np.empty(data.shape, np.complex64)
+    F.real = np.cos(data)
+    F.imag = np.sin(data)
     F.tofile(out_file)
     return out_file
 
@@ -614,13 +619,9 @@ def write_complex_int16(data, out_file):
         data is complex 2-D matrix
         real, imagery, real, ...
     """
-    num_pixel = data.size
-    id1 = list(range(0, 2 * num_pixel, 2))
-    id2 = list(range(1, 2 * num_pixel, 2))
-
-    F = np.zeros([2 * num_pixel, 1], np.int16)
-    F[id1] = np.reshape(np.array(data.real, np.int16), (num_pixel, 1))
-    F[id2] = np.reshape(np.array(data.imag, np.int16), (num_pixel, 1))
+    F = np.empty(data.shape + (2,), np.int16)
+    F[..., 0] = data.real
+    F[..., 1] = data.imag
     F.tofile(out_file)
     return out_file
 
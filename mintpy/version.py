@@ -10,9 +10,15 @@ import subprocess
 
 def get_release_info(version='v1.3.0', date='2021-03-06'):
     """Grab version and date of the latest commit from a git repository"""
+    # use the hardwired release info if not a git repository, e.g. an installed package
+    # to skip the git calls (2 sub-processes) on every import
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if not os.path.exists(os.path.join(repo_dir, '.git')):
+        return version, date
+
     # go to the repository directory
     dir_orig = os.getcwd()
-    os.chdir(os.path.dirname(os.path.dirname(__file__)))
+    os.chdir(repo_dir)
 
     # grab git info into string
     try:
@@ -28,7 +34,8 @@ def get_release_info(version='v1.3.0', date='2021-03-06'):
         cmd = "git log -1 --date=short --format=%cd"
         date = subprocess.check_output(cmd.split(), stderr=subprocess.DEVNULL)
         date = date.decode('utf-8').strip()
-    except:
+    except Exception:
+        # not KeyboardInterrupt/SystemExit, so Ctrl+C is not swallowed
         pass
 
     # go back to the original directory
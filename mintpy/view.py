@@ -124,10 +124,20 @@ def create_parser():
     return parser
 
 
+# parser is built once and re-used by the following calls in the same process,
+# e.g. the multiple view.main() calls in smallbaselineApp.plot_result()
+parser = None
+
 def cmd_line_parse(iargs=None):
     """Command line parser."""
-    parser = create_parser()
+    global parser
+    if parser is None:
+        parser = create_parser()
     inps = parser.parse_args(args=iargs)
+    # copy the list values, as the cached parser hands back the same default list objects on every call
+    for key, value in vars(inps).items():
+        if isinstance(value, list):
+            setattr(inps, key, list(value))
 
     # check invalid file inputs
     for key in ['file','dem_file','mask_file','pts_file']:
@@ -770,7 +780,8 @@ def search_dataset_input(allList, inList=[], inNumList=[], search_dset=True):
         else:
             tempList += [i for i in inList if i in allList]
         tempList = sorted(list(set(tempList)))
-        inNumList += [allList.index(e) for e in tempList]
+        # new list, instead of extending the input one in place
+        inNumList = list(inNumList) + [allList.index(e) for e in tempList]
 
     # inNumList --> outNumList
     outNumList = sorted(list(set(inNumList)))
@@ -989,9 +1000,8 @@ def read_data4figure(i_start, i_end, inps, metadata):
                                          datasetName=dset_list,
                                          box=ref_box,
                                          print_msg=False)[0]
-                for i in range(data.shape[0]):
-                    mask = data[i, :, :] != 0.
-                    data[i, mask] -= ref_data[i]
+                ref_data = np.array(ref_data, dtype=data.dtype).reshape(-1, 1, 1)
+                np.subtract(data, ref_data, out=data, where=(data != 0.))
 
     # slow reading with one 2D matrix at a time
     else:
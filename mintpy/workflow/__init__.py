@@ -2,9 +2,14 @@
 ## Recommended usage:
 ##     import mintpy
 ##     import mintpy.workflow
+##
+## Modules are imported on first access, e.g. mintpy.load_data or
+## mintpy.workflow.load_data, instead of all at once at import time.
+## Set environment variable MINTPY_EAGER_IMPORT=1 to import all of them at once.
 
 
-from pathlib import Path
+import os
+import sys
 import importlib
 
 
@@ -35,6 +40,28 @@ __all__ = [
     'view',
 ]
 
-root_module = Path(__file__).parent.parent.name   #mintpy
-for module in __all__:
-    importlib.import_module(root_module + '.' + module)
+root_module = __name__.split('.')[0]   #mintpy
+
+
+def __getattr__(name):
+    """Import the workflow module on its first access (PEP 562)."""
+    if name in __all__:
+        module = importlib.import_module(root_module + '.' + name)
+        # cache as module attribute, so later access skips __getattr__
+        globals()[name] = module
+        return module
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    """List the not-yet-imported modules as well, for tab completion in IPython/Jupyter."""
+    return sorted(set(globals().keys()) | set(__all__))
+
+
+# import all modules at once if:
+# 1) module-level __getattr__ is not supported, i.e. before python 3.7, OR
+# 2) MINTPY_EAGER_IMPORT=1 is set, e.g. to catch import errors early for debugging
+if (sys.version_info < (3, 7)
+        or os.environ.get('MINTPY_EAGER_IMPORT', '0').lower() in ['1', 'yes', 'true']):
+    for module in __all__:
+        globals()[module] = importlib.import_module(root_module + '.' + module)